@@ -1,23 +1,45 @@
+import sys
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, Union
 
-from PySide2.QtGui import QPixmap
+from PySide2.QtGui import QImage, QPixmap
 
+# slots are supported by dataclasses since Python 3.10
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(frozen=True, eq=False, **_SLOTS)
 class AssetDetails:
     fullname: str
     version: int
     created_at: datetime
     modified_at: datetime
     thumbnail: Optional[QPixmap] = None
+    # decoded in a worker thread, converted to a pixmap in the main thread
+    thumbnail_image: Optional[QImage] = None
+    # humanized dates computed in a worker thread at *humanized_at*
+    # (time.monotonic), see utils.humanize_asset_details
+    created_humanized: Optional[str] = None
+    modified_humanized: Optional[str] = None
+    humanized_at: Optional[float] = None
 
 
-@dataclass
+@dataclass(frozen=True, eq=False, **_SLOTS)
 class AssetInfo:
     id: Union[int, str]
     type: str
     name: str
+    level: Optional[str] = None
+    category: Optional[str] = None
     icon: Optional[QPixmap] = None
     details: Optional[AssetDetails] = None
+
+
+@dataclass(frozen=True, eq=False, **_SLOTS)
+class ProjectInfo:
+    id: int
+    title: str
+    thumbnail: Optional[QPixmap] = None
+    # decoded in a worker thread, converted to a pixmap in the main thread
+    thumbnail_image: Optional[QImage] = None
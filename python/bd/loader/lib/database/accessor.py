@@ -1,6 +1,6 @@
-from typing import Callable, List, Optional, Union
+from typing import Any, Callable, List, Optional, Set, Union
 
-from PySide2 import QtGui
+from PySide2 import QtCore, QtGui
 
 from bd.hooks.main import execute as execute_hook
 from bd.hooks.exceptions import HooksNotLoadedError, HookNotFoundError
@@ -8,73 +8,121 @@ from bd.context import Project
 
 from ..data_models import AssetInfo, AssetDetails
 from ..threading_utils import RequestRunnable
-from .base import DBAccessor
+from ..utils import humanize_asset_details
+from .base import (
+    AssetCache,
+    DBAccessor,
+    filter_assets_by_regex,
+    get_page,
+    regex_engine,
+)
 
 
 class Accessor(DBAccessor):
     def __init__(self):
         super().__init__()
         self._project: Optional[Project] = None
+        self._asset_cache = AssetCache()
+        # names of the hooks which are not registered
+        self._missing_hooks: Set[str] = set()
 
     def set_active_project(self, project: Project) -> None:
         self._project = project
+        self._asset_cache.clear()
+        self._missing_hooks.clear()
+
+    def _execute_hook(self, name: str, *args) -> Any:
+        """Execute the hook and return its only result.
+
+        Once a hook is known to be missing, it's not looked up in the registry
+        again, which is noticeable for the hooks called once per asset.
+        """
+        if name in self._missing_hooks:
+            return None
+
+        try:
+            return execute_hook(name, *args).one()
+        except HookNotFoundError:
+            self._missing_hooks.add(name)
+        except HooksNotLoadedError:
+            pass
 
     def request_asset_types(self, callback: Callable[[List[str]], None]) -> None:
         if self._project is None:
             return
 
+        project = self._project
+
         def _request() -> List[str]:
-            result = []
-            try:
-                result = (
-                    execute_hook("bd.loader.get_asset_types", self._project).one()
-                    or result
-                )
-            except (HookNotFoundError, HooksNotLoadedError):
-                pass
+            result = self._execute_hook("bd.loader.get_asset_types", project) or []
+
+            if project is self._project:
+                self._asset_cache.set_asset_types(result)
+
             return result
 
         RequestRunnable.execute(_request, callback)
 
     def request_assets(
-        self, asset_type: str, callback: Callable[[List[AssetInfo]], None]
+        self,
+        asset_type: str,
+        callback: Callable[[List[AssetInfo]], None],
+        limit: Optional[int] = None,
+        offset: int = 0,
     ) -> None:
         if self._project is None:
             return
 
+        project = self._project
+        cached_assets = self._asset_cache.get_assets(asset_type)
+
         def _request() -> List[AssetInfo]:
-            result = []
-            try:
-                result = (
-                    execute_hook(
-                        "bd.loader.get_assets", self._project, asset_type
-                    ).one()
-                    or result
-                )
-            except (HookNotFoundError, HooksNotLoadedError):
-                pass
-            return result
+            # the hook returns all the assets at once,
+            # so the next pages are taken from the cache
+            if cached_assets is not None:
+                return get_page(cached_assets, limit, offset)
+
+            result = (
+                self._execute_hook("bd.loader.get_assets", project, asset_type) or []
+            )
+
+            if project is self._project:
+                self._asset_cache.set_assets(asset_type, result)
+
+            return get_page(result, limit, offset)
 
         RequestRunnable.execute(_request, callback)
 
     def request_assets_by_regex(
-        self, regex: str, callback: Callable[[List[AssetInfo]], None]
+        self,
+        regex: str,
+        callback: Callable[[List[AssetInfo]], None],
+        limit: Optional[int] = None,
+        offset: int = 0,
     ) -> None:
         if not self._project:
             return
 
+        # if all the assets are already loaded, filter them locally
+        # instead of sending the regex to the database
+        cached_assets = self._asset_cache.get_all_assets()
+
         def _request() -> List[AssetInfo]:
-            result = []
-            try:
-                result = (
-                    execute_hook(
-                        "bd.loader.get_assets_by_regex", self._project, regex
-                    ).one()
-                    or result
+            if cached_assets is not None:
+                try:
+                    return get_page(
+                        filter_assets_by_regex(regex, cached_assets), limit, offset
+                    )
+                except regex_engine.error:
+                    pass
+
+            result = (
+                self._execute_hook(
+                    "bd.loader.get_assets_by_regex", self._project, regex
                 )
-            except (HookNotFoundError, HooksNotLoadedError):
-                pass
-            return result
+                or []
+            )
+            return get_page(result, limit, offset)
 
         RequestRunnable.execute(_request, callback)
 
@@ -82,26 +130,35 @@ class Accessor(DBAccessor):
         self,
         asset_info: AssetInfo,
         callback: Callable[[Union[AssetDetails, None]], None],
+        request_id: Optional[int] = None,
     ):
         if self._project is None:
             return
 
+        self._set_latest_details_request(request_id)
+
         def _request() -> Union[AssetDetails, None]:
-            try:
-                return execute_hook(
-                    "bd.loader.get_assets_details", self._project, asset_info
-                ).one()
-            except (HookNotFoundError, HooksNotLoadedError):
-                pass
+            # don't bother if another asset was selected in the meantime
+            if self._is_details_request_superseded(request_id):
+                return None
 
-        RequestRunnable.execute(_request, callback)
+            asset_details = self._execute_hook(
+                "bd.loader.get_assets_details", self._project, asset_info
+            )
+            if asset_details is None:
+                return None
+
+            return humanize_asset_details(asset_details)
+
+        def _result_callback(asset_details: Union[AssetDetails, None]):
+            if not self._is_details_request_superseded(request_id):
+                callback(asset_details)
+
+        RequestRunnable.execute(_request, _result_callback)
 
     def load_asset_icon_pixmap(
-        self, asset_info: AssetInfo
-    ) -> Union[QtGui.QPixmap, None]:
-        try:
-            return execute_hook(
-                "bd.loader.load_asset_icon_pixmap", self._project, asset_info
-            ).one()
-        except (HookNotFoundError, HooksNotLoadedError):
-            pass
+        self, asset_info: AssetInfo, size: Optional[QtCore.QSize] = None
+    ) -> Union[QtGui.QPixmap, QtGui.QImage, None]:
+        return self._execute_hook(
+            "bd.loader.load_asset_icon_pixmap", self._project, asset_info
+        )
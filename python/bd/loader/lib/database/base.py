@@ -1,4 +1,5 @@
-from typing import Callable, List, Optional, Union
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Union
 
 from PySide2 import QtGui, QtCore
 
@@ -6,8 +7,92 @@ from bd.context import Project
 
 from ..data_models import AssetInfo, AssetDetails
 
+try:
+    import re2 as regex_engine
+except ImportError:
+    import re as regex_engine
+
+
+@lru_cache(maxsize=128)
+def compile_regex(regex: str):
+    """Compile a case insensitive regular expression only once.
+
+    The DFA based 're2' engine is used if available.
+    """
+    return regex_engine.compile(f"(?i){regex}")
+
+
+def get_page(items: list, limit: Optional[int], offset: int) -> list:
+    if limit is None:
+        return items[offset:]
+    return items[offset : offset + limit]
+
+
+def filter_assets_by_regex(regex: str, assets: List[AssetInfo]) -> List[AssetInfo]:
+    search = compile_regex(regex).search
+    return [asset for asset in assets if search(asset.name)]
+
+
+class AssetCache:
+    """Keeps the assets already received from the database per asset type."""
+
+    def __init__(self):
+        self._asset_types: Optional[List[str]] = None
+        self._assets: Dict[str, List[AssetInfo]] = {}
+        # pages received so far of the asset types not fully loaded yet
+        self._partial_assets: Dict[str, List[AssetInfo]] = {}
+
+    def clear(self) -> None:
+        self._asset_types = None
+        self._assets = {}
+        self._partial_assets = {}
+
+    def set_asset_types(self, asset_types: List[str]) -> None:
+        self._asset_types = list(asset_types)
+
+    def set_assets(self, asset_type: str, assets: List[AssetInfo]) -> None:
+        self._assets[asset_type] = list(assets)
+
+    def add_assets_page(
+        self, asset_type: str, offset: int, assets: List[AssetInfo], is_last: bool
+    ) -> None:
+        """Accumulate the consecutive pages until the last one is received."""
+        if offset == 0:
+            partial_assets = self._partial_assets[asset_type] = []
+        else:
+            partial_assets = self._partial_assets.get(asset_type)
+            # the pages have to be received in order, without gaps
+            if partial_assets is None or len(partial_assets) != offset:
+                self._partial_assets.pop(asset_type, None)
+                return
+
+        partial_assets.extend(assets)
+
+        if is_last:
+            self._assets[asset_type] = self._partial_assets.pop(asset_type)
+
+    def get_assets(self, asset_type: str) -> Optional[List[AssetInfo]]:
+        return self._assets.get(asset_type)
+
+    def get_all_assets(self) -> Optional[List[AssetInfo]]:
+        """Return the assets of all the asset types or None if any is missing."""
+        if self._asset_types is None:
+            return None
+
+        result = []
+        for asset_type in self._asset_types:
+            assets = self._assets.get(asset_type)
+            if assets is None:
+                return None
+            result.extend(assets)
+
+        return result
+
 
 class DBAccessor(QtCore.QObject):
+    # id of the latest asset details request, see request_asset_details
+    _latest_details_request_id = 0
+
     def set_active_project(self, project: Project) -> None:
         raise NotImplementedError()
 
@@ -15,23 +100,50 @@ class DBAccessor(QtCore.QObject):
         raise NotImplementedError()
 
     def request_assets(
-        self, asset_type: str, callback: Callable[[List[AssetInfo]], None]
+        self,
+        asset_type: str,
+        callback: Callable[[List[AssetInfo]], None],
+        limit: Optional[int] = None,
+        offset: int = 0,
     ) -> None:
+        """Request the assets of the type, at most *limit* of them from *offset*."""
         raise NotImplementedError()
 
     def request_assets_by_regex(
-        self, regex: str, callback: Callable[[List[AssetInfo]], None]
+        self,
+        regex: str,
+        callback: Callable[[List[AssetInfo]], None],
+        limit: Optional[int] = None,
+        offset: int = 0,
     ) -> None:
+        """Request the assets matching the regex, at most *limit* from *offset*."""
         raise NotImplementedError()
 
     def request_asset_details(
         self,
         asset_info: AssetInfo,
         callback: Callable[[Union[AssetDetails, None]], None],
+        request_id: Optional[int] = None,
     ):
+        """Request the details of the asset.
+
+        If *request_id* is given, the request is dropped without calling
+        the *callback* once a request with a greater id is made.
+        """
         raise NotImplementedError()
 
+    def _set_latest_details_request(self, request_id: Optional[int]) -> None:
+        if request_id is not None and request_id > self._latest_details_request_id:
+            self._latest_details_request_id = request_id
+
+    def _is_details_request_superseded(self, request_id: Optional[int]) -> bool:
+        return request_id is not None and request_id < self._latest_details_request_id
+
     def load_asset_icon_pixmap(
-        self, asset_info: AssetInfo
-    ) -> Union[QtGui.QPixmap, None]:
+        self, asset_info: AssetInfo, size: Optional[QtCore.QSize] = None
+    ) -> Union[QtGui.QPixmap, QtGui.QImage, None]:
+        """Load the asset icon, scaled to the *size* if the accessor supports it.
+
+        It's called from the worker threads, so returning QImage is preferred.
+        """
         raise NotImplementedError()
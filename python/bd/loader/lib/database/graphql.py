@@ -1,8 +1,19 @@
 import os
-import base64
-from typing import Callable, List, Optional, Union
-
-from PySide2 import QtGui
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from functools import partial
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from PySide2 import QtCore, QtGui
+
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 
 os.environ["BD_AUTH0_CLIENT_ID"] = "U0nDaM5dmbJhxpjY8vYRGaPdfrOuNOPJ"
 os.environ["BD_AUTH0_DOMAIN"] = "brudanstudios.eu.auth0.com"
@@ -13,27 +24,287 @@ os.environ["BD_API_CACHE_ALLOWABLE_METHODS"] = "POST,GET,HEAD"
 
 from bd.api import Session
 
-from .base import DBAccessor
+from .base import (
+    AssetCache,
+    DBAccessor,
+    compile_regex,
+    filter_assets_by_regex,
+    get_page,
+    regex_engine,
+)
 from ..data_models import AssetInfo, AssetDetails, ProjectInfo
 from ..threading_utils import RequestRunnable
+from ..utils import humanize, read_image
+
+log = logging.getLogger(__name__)
+
+# longest side of the thumbnails passed to the main thread
+THUMBNAIL_MAX_SIZE = 512
+
+
+GET_PROJECTS_QUERY = """
+query GetProjects($titles: [String!]!) {
+    projects(where: {title: {_nin: $titles}, active: {_eq: true}}) {
+        id
+        title
+        thumbnail
+    }
+}"""
+
+GET_ASSETS_TAXONOMY_QUERY = """
+query GetAssetsTaxonomy($project_id: Int!) {
+    assets(
+        distinct_on: [type, level, category],
+        where: {
+            projects_id: {_eq: $project_id},
+            type: {_neq: ""}
+        }
+    ) {
+        type
+        level
+        category
+    }
+}"""
+
+GET_ASSETS_BY_REGEX_QUERY = """
+query GetAsset(
+    $project_id: Int!, $regex: String!, $limit: Int, $offset: Int!
+) {
+    assets(
+        where: {
+            projects_id: {_eq: $project_id}, 
+            type: {_neq: ""}, 
+            name: {_iregex: $regex}
+        },
+        order_by: {name: asc},
+        limit: $limit,
+        offset: $offset
+    ) {
+        id
+        type
+        name
+        level
+        category
+    }
+}"""
+
+GET_ASSETS_DETAILS_QUERY = """
+query GetAssetsDetails($ids: [Int!]!) {
+    assets(where: {id: {_in: $ids}}) {
+        id
+        thumbnail
+        component {
+            created_at
+            revisions (order_by: {created_at:desc}, limit: 1) {
+                created_at
+                version
+            }
+        }
+    }
+}"""
+
+GET_ASSET_ICON_QUERY = """
+query GetAsset($id: Int!) {
+    assets_by_pk(id: $id) {
+        icon
+    }
+}"""
+
+
+def _build_get_assets_query(by_level: bool, by_category: bool) -> str:
+    query_args = ["$project_id: Int!, $type: String!, $limit: Int, $offset: Int!"]
+    conditions = ["projects_id: {_eq: $project_id}", "type: {_eq: $type}"]
+
+    if by_level:
+        query_args.append("$level: String")
+        conditions.append("level: {_eq: $level}")
+
+    if by_category:
+        query_args.append("$category: String")
+        conditions.append("category: {_eq: $category}")
+
+    return """
+query GetAssets(%s) {
+    assets(
+        where: {
+            %s
+        },
+        order_by: {name: asc},
+        limit: $limit,
+        offset: $offset
+    ) {
+        id
+        type
+        name
+        level
+        category
+    }
+}""" % (", ".join(query_args), ", ".join(conditions))
+
+
+# all the combinations of the optional level and category filters
+GET_ASSETS_QUERIES: Dict[Tuple[bool, bool], str] = {
+    (by_level, by_category): _build_get_assets_query(by_level, by_category)
+    for by_level in (False, True)
+    for by_category in (False, True)
+}
+
+
+_session: Optional[Session] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> Session:
+    """Get the session shared by all the accessors.
+
+    The session is already used from many worker threads at once,
+    sharing it also lets all of them reuse the same connections.
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = Session()
+
+    return _session
+
+
+def _create_asset_infos_from_db_items(
+    items: List[dict], _AssetInfo=AssetInfo
+) -> List[AssetInfo]:
+    # the AssetInfo class is bound to a local name to avoid global lookups
+    return [
+        _AssetInfo(
+            id=item["id"],
+            type=item["type"],
+            name=item["name"],
+            level=item.get("level"),
+            category=item.get("category"),
+        )
+        for item in items
+    ]
+
+
+def _create_asset_details_dict(item: dict) -> dict:
+    thumbnail = None
+    if item.get("thumbnail"):
+        # pixmaps can't be created outside the main thread
+        thumbnail = read_image(base64.b64decode(item["thumbnail"]))
+        if (
+            thumbnail.width() > THUMBNAIL_MAX_SIZE
+            or thumbnail.height() > THUMBNAIL_MAX_SIZE
+        ):
+            thumbnail = thumbnail.scaled(
+                THUMBNAIL_MAX_SIZE,
+                THUMBNAIL_MAX_SIZE,
+                QtCore.Qt.KeepAspectRatio,
+                QtCore.Qt.SmoothTransformation,
+            )
+
+    component = item["component"]
+    created_at = component["created_at"]
+
+    revision = component["revisions"][0]
+    version = revision["version"]
+    modified_at = revision["created_at"]
+
+    return dict(
+        thumbnail=thumbnail,
+        version=version,
+        created_at=created_at,
+        modified_at=modified_at,
+        created_humanized=humanize(created_at),
+        modified_humanized=humanize(modified_at),
+        humanized_at=time.monotonic(),
+    )
+
+
+class QueryCache:
+    """Thread-safe LRU cache of the query results which expire after a while."""
+
+    def __init__(self, ttl: float, maxsize: int = 256):
+        self._ttl = ttl
+        self._maxsize = maxsize
+        # expire time, result and whether the query is scoped to a project
+        self._items: "OrderedDict[bytes, Tuple[float, dict, bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_key(query: str, variables: dict) -> bytes:
+        return hashlib.blake2b(
+            (query + repr(sorted(variables.items()))).encode("utf-8")
+        ).digest()
+
+    def get(self, query: str, variables: dict) -> Optional[dict]:
+        key = self._make_key(query, variables)
+
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+
+            expire_time, result, _ = item
+            if expire_time < time.monotonic():
+                del self._items[key]
+                return None
+
+            self._items.move_to_end(key)
+            return result
+
+    def set(self, query: str, variables: dict, result: dict) -> None:
+        key = self._make_key(query, variables)
+        is_project_scoped = "project_id" in variables
+
+        with self._lock:
+            self._items[key] = (time.monotonic() + self._ttl, result, is_project_scoped)
+            self._items.move_to_end(key)
+            if len(self._items) > self._maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def clear_project_scoped(self) -> None:
+        """Drop the results of the queries made for a specific project."""
+        with self._lock:
+            for key in [key for key, item in self._items.items() if item[2]]:
+                del self._items[key]
 
 
 class GraphQLAccessor(DBAccessor):
     def __init__(self):
         super().__init__()
         self._project: Optional[ProjectInfo] = None
-        self._session = Session()
-
-    def get_projects(self, excluded_titles) -> List[ProjectInfo]:
-        result = self._session.execute(
-            """
-            query GetProjects($titles: [String!]!) {
-                projects(where: {title: {_nin: $titles}, active: {_eq: true}}) {
-                    id
-                    title
-                    thumbnail
-                }
-            }""",
+        self._session = _get_session()
+        self._asset_cache = AssetCache()
+        self._query_cache = QueryCache(
+            ttl=float(os.environ["BD_API_CACHE_EXPIRE_TIME"])
+        )
+
+        self._details_batch: List[
+            Tuple[
+                AssetInfo, Callable[[Union[AssetDetails, None]], None], Optional[int]
+            ]
+        ] = []
+        self._details_timer = QtCore.QTimer(self)
+        self._details_timer.setSingleShot(True)
+        self._details_timer.setInterval(20)
+        self._details_timer.timeout.connect(self._request_batched_asset_details)
+
+    def request_projects(
+        self, excluded_titles: List[str], callback: Callable[[List[ProjectInfo]], None]
+    ) -> None:
+        def _result_callback(projects: List[ProjectInfo]):
+            callback(self._create_project_pixmaps(projects))
+
+        RequestRunnable.execute(
+            partial(self._query_projects, excluded_titles), _result_callback
+        )
+
+    def _query_projects(self, excluded_titles: List[str]) -> List[ProjectInfo]:
+        result = self._execute_cached(
+            GET_PROJECTS_QUERY,
             {"titles": excluded_titles},
         )
         items = result["projects"]
@@ -41,40 +312,78 @@ class GraphQLAccessor(DBAccessor):
         projects = []
 
         for item in items:
+            # pixmaps can't be created outside the main thread
+            image = read_image(base64.b64decode(item["thumbnail"]))
 
-            pixmap = QtGui.QPixmap()
-            pixmap.loadFromData(base64.b64decode(item["thumbnail"].encode("utf-8")))
-
-            project = ProjectInfo(id=item["id"], title=item["title"], thumbnail=pixmap)
+            project = ProjectInfo(
+                id=item["id"], title=item["title"], thumbnail_image=image
+            )
             projects.append(project)
 
         return projects
 
+    @staticmethod
+    def _create_project_pixmaps(projects: List[ProjectInfo]) -> List[ProjectInfo]:
+        """Convert the decoded thumbnails to pixmaps, in the main thread only."""
+        return [
+            replace(
+                project,
+                thumbnail=QtGui.QPixmap.fromImage(project.thumbnail_image),
+                thumbnail_image=None,
+            )
+            for project in projects
+        ]
+
+    def _execute_cached(self, query: str, variables: dict) -> dict:
+        """Execute the query which result barely changes during the session."""
+        result = self._query_cache.get(query, variables)
+        if result is None:
+            result = self._session.execute(query, variables)
+            self._query_cache.set(query, variables, result)
+
+        return result
+
     def set_active_project(self, project: ProjectInfo) -> None:
         self._project = project
+        self._asset_cache.clear()
+        # the projects query doesn't depend on the active project
+        self._query_cache.clear_project_scoped()
+
+    def _get_taxonomy(self, project: ProjectInfo) -> Set[Tuple[str, str, str]]:
+        """Get the distinct (type, level, category) tuples of the project assets.
+
+        The asset types, levels and categories are derived from the same
+        tuples, so they are fetched with a single query once per project.
+        """
+        result = self._execute_cached(
+            GET_ASSETS_TAXONOMY_QUERY,
+            {"project_id": project.id},
+        )
+        return {
+            (item["type"], item.get("level"), item.get("category"))
+            for item in result["assets"]
+        }
 
     def request_asset_types(self, callback: Callable[[List[str]], None]) -> None:
         if self._project is None:
             return
 
+        project = self._project
+
         def _request() -> List[str]:
-            result = self._session.execute(
-                """
-                query GetAssetTypes($project_id: Int!) {
-                    assets(
-                        distinct_on: type, 
-                        where: {
-                            projects_id: {_eq: $project_id}, 
-                            type: {_neq: "CAM"}
-                        }
-                    ) {
-                        type
-                    }
-                }""",
-                {"project_id": self._project.id},
+            taxonomy = self._get_taxonomy(project)
+            asset_types = sorted(
+                {
+                    asset_type
+                    for asset_type, _, _ in taxonomy
+                    if asset_type and asset_type != "CAM"
+                }
             )
-            items = result["assets"]
-            return [item["type"] for item in items if item["type"]]
+
+            if project is self._project:
+                self._asset_cache.set_asset_types(asset_types)
+
+            return asset_types
 
         RequestRunnable.execute(_request, callback)
 
@@ -88,25 +397,17 @@ class GraphQLAccessor(DBAccessor):
         if self._project is None or asset_type == "CHR" or asset_level == "ENV":
             return
 
+        project = self._project
+
         def _request() -> List[str]:
-            result = self._session.execute(
-                """
-                query GetAssetCategories($project_id: Int!, $type: String!) {
-                    assets(
-                        distinct_on: category, 
-                        where: {
-                            projects_id: {_eq: $project_id}, 
-                            type: {_eq: $type},
-                            category: {_neq: ""}
-                        }
-                    ) {
-                        category
-                    }
-                }""",
-                {"project_id": self._project.id, "type": asset_type},
+            taxonomy = self._get_taxonomy(project)
+            return sorted(
+                {
+                    category
+                    for type_, _, category in taxonomy
+                    if type_ == asset_type and category
+                }
             )
-            items = result["assets"]
-            return [item["category"] for item in items if item["category"]]
 
         RequestRunnable.execute(_request, callback)
 
@@ -116,25 +417,13 @@ class GraphQLAccessor(DBAccessor):
         if self._project is None:
             return
 
+        project = self._project
+
         def _request() -> List[str]:
-            result = self._session.execute(
-                """
-                query GetAssetLevels($project_id: Int!, $type: String!) {
-                    assets(
-                        distinct_on: level, 
-                        where: {
-                            projects_id: {_eq: $project_id}, 
-                            type: {_eq: $type},
-                            level: {_neq: ""}
-                        }
-                    ) {
-                        level
-                    }
-                }""",
-                {"project_id": self._project.id, "type": asset_type},
+            taxonomy = self._get_taxonomy(project)
+            return sorted(
+                {level for type_, level, _ in taxonomy if type_ == asset_type and level}
             )
-            items = result["assets"]
-            return [item["level"] for item in items if item["level"]]
 
         RequestRunnable.execute(_request, callback)
 
@@ -142,86 +431,107 @@ class GraphQLAccessor(DBAccessor):
         self,
         asset_type: str,
         callback: Callable[[List[AssetInfo]], None],
+        limit: Optional[int] = None,
+        offset: int = 0,
+        *,
         asset_level: Optional[str] = None,
         asset_category: Optional[str] = None,
     ) -> None:
         if self._project is None:
             return
 
-        query_args = ["$project_id: Int!, $type: String!"]
-        conditions = ["projects_id: {_eq: $project_id}", "type: {_eq: $type}"]
-        variables = {"project_id": self._project.id, "type": asset_type}
+        is_filtered = bool(asset_level or asset_category)
+
+        cached_assets = self._asset_cache.get_assets(asset_type)
+        if cached_assets is not None and not is_filtered:
+            RequestRunnable.execute(
+                partial(get_page, cached_assets, limit, offset), callback
+            )
+            return
+
+        variables = {
+            "project_id": self._project.id,
+            "type": asset_type,
+            "limit": limit,
+            "offset": offset,
+        }
 
         if asset_level:
-            query_args.append("$level: String")
-            conditions.append("level: {_eq: $level}")
             variables["level"] = asset_level
 
         if asset_category:
-            query_args.append("$category: String")
-            conditions.append("category: {_eq: $category}")
             variables["category"] = asset_category
 
+        query = GET_ASSETS_QUERIES[(bool(asset_level), bool(asset_category))]
+
         def _request() -> List[dict]:
-            result = self._session.execute(
-                """
-                query GetAssets(%s) {
-                    assets(
-                        where: {
-                            %s
-                        },
-                        order_by: {name: asc}
-                    ) {
-                        id
-                        type
-                        name
-                        level
-                        category
-                    }
-                }"""
-                % (", ".join(query_args), ", ".join(conditions)),
-                variables,
-            )
+            result = self._session.execute(query, variables)
             items = result["assets"]
             return items
 
+        project = self._project
+
         def _result_callback(items: List[dict]):
-            callback(list(map(self._create_asset_info_from_db_item, items)))
+            assets = _create_asset_infos_from_db_items(items)
+
+            # the pages are cached once all of them are received,
+            # the last one is shorter than the limit
+            if project is self._project and not is_filtered:
+                self._asset_cache.add_assets_page(
+                    asset_type,
+                    offset,
+                    assets,
+                    is_last=limit is None or len(assets) < limit,
+                )
+
+            callback(assets)
 
         RequestRunnable.execute(_request, _result_callback)
 
     def request_assets_by_regex(
-        self, regex: str, callback: Callable[[List[AssetInfo]], None]
+        self,
+        regex: str,
+        callback: Callable[[List[AssetInfo]], None],
+        limit: Optional[int] = None,
+        offset: int = 0,
     ) -> None:
         if not self._project:
             return
 
+        cached_assets = self._asset_cache.get_all_assets()
+        if cached_assets is not None:
+            try:
+                # compile the regex in the calling thread to make sure it's valid
+                compile_regex(regex)
+            except regex_engine.error:
+                cached_assets = None
+
+        if cached_assets is not None:
+            # all the assets are already loaded, so filter them locally
+            # instead of sending the regex to the database
+            RequestRunnable.execute(
+                lambda: get_page(
+                    filter_assets_by_regex(regex, cached_assets), limit, offset
+                ),
+                callback,
+            )
+            return
+
         def _request() -> List[dict]:
             result = self._session.execute(
-                """
-                query GetAsset($project_id: Int!, $regex: String!) {
-                    assets(
-                        where: {
-                            projects_id: {_eq: $project_id}, 
-                            type: {_neq: ""}, 
-                            name: {_iregex: $regex}
-                        },
-                        order_by: {name: asc}
-                    ) {
-                        id
-                        type
-                        name
-                        level
-                        category
-                    }
-                }""",
-                {"project_id": self._project.id, "regex": regex},
+                GET_ASSETS_BY_REGEX_QUERY,
+                {
+                    "project_id": self._project.id,
+                    "regex": regex,
+                    "limit": limit,
+                    "offset": offset,
+                },
             )
             items = result["assets"]
             return items
 
         def _result_callback(items: List[dict]):
-            callback(list(map(self._create_asset_info_from_db_item, items)))
+            callback(_create_asset_infos_from_db_items(items))
 
         RequestRunnable.execute(_request, _result_callback)
 
@@ -229,99 +539,105 @@ class GraphQLAccessor(DBAccessor):
         self,
         asset_info: AssetInfo,
         callback: Callable[[Union[AssetDetails, None]], None],
+        request_id: Optional[int] = None,
     ):
         if self._project is None:
             return
 
-        def _request() -> Union[dict, None]:
-            result = self._session.execute(
-                """
-                query GetAsset($id: Int!) {
-                    assets_by_pk(id: $id) {
-                        thumbnail
-                        component {
-                            created_at
-                            revisions (order_by: {created_at:desc}, limit: 1) {
-                                created_at
-                                version
-                            }
-                        }
-                    }
-                }""",
-                {"id": asset_info.id},
-            )
-            item = result["assets_by_pk"]
+        self._set_latest_details_request(request_id)
+
+        # the requests made in a short period of time are sent in one query
+        self._details_batch.append((asset_info, callback, request_id))
+        if not self._details_timer.isActive():
+            self._details_timer.start()
+
+    def _request_batched_asset_details(self) -> None:
+        # don't query the details which nobody waits for anymore
+        batch = [
+            request
+            for request in self._details_batch
+            if not self._is_details_request_superseded(request[2])
+        ]
+        self._details_batch = []
+        if not batch:
+            return
 
-            thumbnail = QtGui.QPixmap()
-            thumbnail.loadFromData(base64.b64decode(item["thumbnail"].encode("utf-8")))
+        asset_ids = list({asset_info.id: None for asset_info, _, _ in batch})
 
-            component = item["component"]
-            created_at = component["created_at"]
+        def _request() -> Dict[int, dict]:
+            try:
+                result = self._session.execute(
+                    GET_ASSETS_DETAILS_QUERY, {"ids": asset_ids}
+                )
+            except Exception:
+                # answer all the callbacks with None instead of none of them
+                log.exception("Unable to request the asset details:")
+                return {}
+
+            asset_details_dicts = {}
+
+            for item in result["assets"]:
+                # a broken row mustn't leave the rest of the batch unanswered
+                try:
+                    asset_details_dicts[item["id"]] = _create_asset_details_dict(item)
+                except Exception:
+                    log.exception(
+                        f"Unable to read the asset details ({item.get('id')}):"
+                    )
 
-            revision = component["revisions"][0]
-            version = revision["version"]
-            modified_at = revision["created_at"]
+            return asset_details_dicts
 
-            return dict(
-                thumbnail=thumbnail,
-                version=version,
-                created_at=created_at,
-                modified_at=modified_at,
-            )
+        def _result_callback(asset_details_dicts: Dict[int, dict]):
+            for asset_info, callback, request_id in batch:
+                if self._is_details_request_superseded(request_id):
+                    continue
 
-        def _result_callback(asset_details_dict: Union[dict, None]):
-            asset_details: Union[AssetDetails, None] = None
-
-            if asset_details_dict:
-                fullname = "_".join(
-                    (
-                        val
-                        for val in [
-                            asset_info.type,
-                            asset_info.level,
-                            asset_info.category,
-                            asset_info.name,
-                        ]
-                        if val
+                asset_details: Union[AssetDetails, None] = None
+
+                asset_details_dict = asset_details_dicts.get(asset_info.id)
+                if asset_details_dict:
+                    asset_details = self._create_asset_details(
+                        asset_info, asset_details_dict
                     )
-                )
-                asset_details = AssetDetails(
-                    fullname=fullname,
-                    version=asset_details_dict["version"],
-                    created_at=asset_details_dict["created_at"],
-                    modified_at=asset_details_dict["modified_at"],
-                    thumbnail=asset_details_dict["thumbnail"],
-                )
 
-            callback(asset_details)
+                callback(asset_details)
 
         RequestRunnable.execute(_request, _result_callback)
 
-    def load_asset_icon_pixmap(self, asset_id: int) -> Union[QtGui.QPixmap, None]:
-        result = self._session.execute(
-            """
-            query GetAsset($id: Int!) {
-                assets_by_pk(id: $id) {
-                    icon
-                }
-            }""",
-            {"id": asset_id},
+    def _create_asset_details(
+        self, asset_info: AssetInfo, asset_details_dict: dict
+    ) -> AssetDetails:
+        fullname = "_".join(
+            (
+                val
+                for val in [
+                    asset_info.type,
+                    asset_info.level,
+                    asset_info.category,
+                    asset_info.name,
+                ]
+                if val
+            )
+        )
+        return AssetDetails(
+            fullname=fullname,
+            version=asset_details_dict["version"],
+            created_at=asset_details_dict["created_at"],
+            modified_at=asset_details_dict["modified_at"],
+            thumbnail_image=asset_details_dict["thumbnail"],
+            created_humanized=asset_details_dict["created_humanized"],
+            modified_humanized=asset_details_dict["modified_humanized"],
+            humanized_at=asset_details_dict["humanized_at"],
         )
+
+    def load_asset_icon_pixmap(
+        self, asset_info: AssetInfo, size: Optional[QtCore.QSize] = None
+    ) -> Union[QtGui.QImage, None]:
+        result = self._session.execute(GET_ASSET_ICON_QUERY, {"id": asset_info.id})
         item = result["assets_by_pk"]
 
         icon = item.get("icon")
         if icon is None:
             return
 
-        pixmap = QtGui.QPixmap()
-        pixmap.loadFromData(base64.b64decode(item["icon"].encode("utf-8")))
-        return pixmap
-
-    def _create_asset_info_from_db_item(self, item: dict):
-        return AssetInfo(
-            id=item["id"],
-            type=item["type"],
-            name=item["name"],
-            level=item.get("level"),
-            category=item.get("category"),
-        )
+        return read_image(base64.b64decode(icon), size)
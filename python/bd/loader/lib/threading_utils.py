@@ -1,142 +1,243 @@
 import logging
-from typing import Callable, Dict, List, Union
-from queue import LifoQueue, Empty
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Union
 
 from PySide2 import QtCore, QtGui
+from appdirs import user_cache_dir
 
 from .data_models import AssetInfo
 from .database.base import DBAccessor
+from .utils import makedirs
 
 log = logging.getLogger(__name__)
 
 IconRequestCallback = Callable[[QtGui.QIcon], None]
 
+# maximum number of icons kept in memory by the IconManager
+ICON_CACHE_SIZE = 2048
 
-class InvokeMethod(QtCore.QObject):
-    """Invokes a callable on a main thread."""
+# maximum number of the icon loaders running at once, the rest of the
+# network thread pool is left to the other requests
+ICON_LOADERS_MAX = 8
 
-    def __init__(self, method: Callable):
+# seconds after which the icons cached on disk are loaded again,
+# so the thumbnails updated in the database reach the view
+ICON_DISK_CACHE_MAX_AGE = 24 * 60 * 60
+
+# the requests mostly wait for the network, so there might be
+# much more of them running at once than there are CPU cores
+_network_pool = QtCore.QThreadPool()
+_network_pool.setMaxThreadCount(32)
+_network_pool.setExpiryTimeout(60000)
+
+
+class MainThreadDispatcher(QtCore.QObject):
+    """Invokes callables on a main thread."""
+
+    called = QtCore.Signal(object)
+
+    def __init__(self):
         super().__init__()
+        self.called.connect(self._execute)  # type: ignore
 
-        main_thread = QtGui.QGuiApplication.instance().thread()
-        self.moveToThread(main_thread)
-        self.setParent(QtGui.QGuiApplication.instance())
-        self.method = method
-        self.called.connect(self.execute)  # type: ignore
-        self.called.emit()  # type: ignore
+    @QtCore.Slot(object)  # type: ignore
+    def _execute(self, method: Callable):
+        method()
 
-    called = QtCore.Signal()
 
-    @QtCore.Slot()  # type: ignore
-    def execute(self):
-        self.method()
-        # trigger garbage collector
-        self.setParent(None)  # type: ignore
+_dispatcher: Optional[MainThreadDispatcher] = None
+_dispatcher_lock = threading.Lock()
 
 
-class PixmapLoader(QtCore.QObject):
-    pixmap_loaded = QtCore.Signal(AssetInfo, QtGui.QPixmap)
+def _get_dispatcher() -> MainThreadDispatcher:
+    global _dispatcher
 
-    def __init__(self, accessor: DBAccessor, queue: "LifoQueue[AssetInfo]"):
-        super().__init__()
-        self._accessor = accessor
-        self._queue = queue
-        self._running: bool = True
-        self._icon_rect = QtCore.QRect(0, 0, 103, 58)
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            app = QtGui.QGuiApplication.instance()
+            _dispatcher = MainThreadDispatcher()
+            _dispatcher.moveToThread(app.thread())
+            _dispatcher.setParent(app)
 
-    def _create_rounded_pixmap(self, pixmap: QtGui.QPixmap):
-        """
+    return _dispatcher
 
-        AI is creating summary for _create_rounded_pixmap
-        Args:
-            pixmap: Hello world
-        """
-        # min_side = min(pixmap.height(), pixmap.width())
 
-        target_rect = QtCore.QRect(0, 0, pixmap.width(), pixmap.height())
-        # target_rect = QtCore.QRect(0, 0, min_side, min_side)
-        target_rect.moveCenter(pixmap.rect().center())
+def invoke_on_main_thread(method: Callable) -> None:
+    """Invoke a callable on a main thread."""
+    # the dispatcher lives on the main thread,
+    # so the emitted signal will be queued from the worker threads
+    _get_dispatcher().called.emit(method)  # type: ignore
 
-        pixmap = pixmap.copy(target_rect).scaledToHeight(
-            self._icon_rect.width(), QtCore.Qt.SmoothTransformation
-        )
 
-        rounded_pixmap = QtGui.QPixmap(self._icon_rect.size())
-        rounded_pixmap.fill(QtCore.Qt.transparent)
+class PixmapLoader:
+    """Loads the asset icon pixmaps and makes them rounded.
 
+    The same loader is shared by all the icon loading runnables,
+    so it must not hold any per-request state.
+    """
+
+    def __init__(self, accessor: DBAccessor, cache_dir: Path):
+        self._accessor = accessor
+        self._cache_dir = cache_dir
+        self._icon_rect = QtCore.QRect(0, 0, 103, 58)
+        self._mask = self._create_mask()
+
+    def _create_mask(self) -> QtGui.QImage:
+        """Create the alpha mask of the rounded icon, which is the same for all."""
         clip_path = QtGui.QPainterPath()
         clip_path.addRoundedRect(self._icon_rect, 4, 4)
 
-        painter = QtGui.QPainter(rounded_pixmap)
+        mask = QtGui.QImage(
+            self._icon_rect.size(), QtGui.QImage.Format_ARGB32_Premultiplied
+        )
+        mask.fill(QtCore.Qt.transparent)
 
+        painter = QtGui.QPainter(mask)
         painter.setRenderHint(painter.Antialiasing)
+        painter.fillPath(clip_path, QtCore.Qt.white)
+        painter.end()
+
+        return mask
 
-        painter.setClipPath(clip_path)
+    def _create_rounded_image(self, image: QtGui.QImage) -> QtGui.QImage:
+        """Create the icon sized image with the rounded corners.
 
-        painter.drawPixmap(self._icon_rect, pixmap)
+        Only QImage is used, so it's safe to call it from the worker threads.
+        """
+        # the accessor might have already decoded the image in the icon size
+        if image.size() != self._icon_rect.size():
+            image = image.scaled(
+                self._icon_rect.size(),
+                QtCore.Qt.IgnoreAspectRatio,
+                QtCore.Qt.SmoothTransformation,
+            )
+
+        rounded_image = image.convertToFormat(
+            QtGui.QImage.Format_ARGB32_Premultiplied
+        )
 
-        return rounded_pixmap
+        # keep only the pixels covered by the mask
+        painter = QtGui.QPainter(rounded_image)
+        painter.setCompositionMode(QtGui.QPainter.CompositionMode_DestinationIn)
+        painter.drawImage(0, 0, self._mask)
+        painter.end()
 
-    def start(self) -> None:
-        while self._running:
-            try:
-                asset_info = self._queue.get(timeout=0.005)
-            except Empty:
-                continue
+        return rounded_image
 
-            try:
-                pixmap = self._accessor.load_asset_icon_pixmap(asset_info)
-                if pixmap:
-                    pixmap = self._create_rounded_pixmap(pixmap)
+    def _load_cached(self, cache_path: Path) -> Optional[QtGui.QImage]:
+        """Load the icon cached on disk, unless it's missing or expired."""
+        try:
+            age = time.time() - cache_path.stat().st_mtime
+        except OSError:
+            return None
 
-                self.pixmap_loaded.emit(asset_info, pixmap)
+        if age > ICON_DISK_CACHE_MAX_AGE:
+            return None
 
-            except Exception as e:
-                log.exception(f"Unable to load the asset icon ({asset_info}): ")
+        image = QtGui.QImage()
+        if not image.load(str(cache_path)):
+            return None
 
-    def stop(self):
-        self._running = False
+        return image
 
+    def load(self, asset_info: AssetInfo) -> QtGui.QImage:
+        cache_path = self._cache_dir / f"{asset_info.id}.png"
 
-class IconManager(QtCore.QObject):
-    def __init__(self, accessor: DBAccessor, parent=None):
-        super().__init__(parent)
-        self._accessor = accessor
-        self._queue: "LifoQueue[AssetInfo]" = LifoQueue()
-        self._pixmap_loaders: List[PixmapLoader] = []
-        self._pixmap_loader_threads: List[QtCore.QThread] = []
-        self._loaded_icons: Dict[Union[int, str], QtGui.QIcon] = {}
-        self._requests: Dict[Union[int, str], IconRequestCallback] = {}
+        # the icon might have been loaded during one of the previous sessions
+        image = self._load_cached(cache_path)
+        if image is not None:
+            return image
+
+        image = self._accessor.load_asset_icon_pixmap(
+            asset_info, self._icon_rect.size()
+        )
+        if isinstance(image, QtGui.QPixmap):
+            image = image.toImage()
 
-    def start(self):
-        for i in range(12):
-            pixmap_loader = PixmapLoader(self._accessor, self._queue)
-            pixmap_loader_thread = QtCore.QThread()
+        if image is None or image.isNull():
+            return QtGui.QImage()
 
-            pixmap_loader.moveToThread(pixmap_loader_thread)
+        image = self._create_rounded_image(image)
+        image.save(str(cache_path), "PNG")
 
-            pixmap_loader_thread.started.connect(pixmap_loader.start)
-            pixmap_loader_thread.finished.connect(pixmap_loader_thread.deleteLater)
-            pixmap_loader_thread.finished.connect(pixmap_loader_thread.deleteLater)
+        return image
+
+
+class IconLoadRunnable(QtCore.QRunnable):
+    """Loads the icons from the queue, the most recently requested first."""
+
+    def __init__(
+        self,
+        pixmap_loader: PixmapLoader,
+        take_next: Callable[[], Optional[AssetInfo]],
+        requests: Dict[Union[int, str], List[IconRequestCallback]],
+        stop_event: threading.Event,
+        pixmap_loaded: QtCore.SignalInstance,
+    ):
+        super().__init__()
+        self._pixmap_loader = pixmap_loader
+        self._take_next = take_next
+        self._requests = requests
+        self._stop_event = stop_event
+        self._pixmap_loaded = pixmap_loaded
+        self.setAutoDelete(True)
 
-            pixmap_loader.pixmap_loaded.connect(self._on_pixmap_loaded)
+    def run(self):
+        # the runnables take the latest requests from the queue, so the icons
+        # requested last (the ones the user is currently looking at) are
+        # loaded first, and keep going until the queue is empty
+        while True:
+            asset_info = self._take_next()
+            if asset_info is None:
+                return
+
+            # the request might have been cancelled while waiting in the queue
+            if asset_info.id not in self._requests:
+                continue
 
-            QtCore.QCoreApplication.instance().aboutToQuit.connect(self._stop_loader)
+            try:
+                image = self._pixmap_loader.load(asset_info)
+                if not self._stop_event.is_set():
+                    self._pixmap_loaded.emit(asset_info, image)
+            except Exception as e:
+                log.exception(f"Unable to load the asset icon ({asset_info}): ")
 
-            pixmap_loader_thread.start()
 
-            self._pixmap_loaders.append(pixmap_loader)
-            self._pixmap_loader_threads.append(pixmap_loader_thread)
+class IconManager(QtCore.QObject):
+    pixmap_loaded = QtCore.Signal(AssetInfo, QtGui.QImage)
 
-    def _stop_loader(self):
-        """Stop the icon loader thread."""
-        for pixmap_loader, pixmap_loader_thread in zip(
-            self._pixmap_loaders, self._pixmap_loader_threads
-        ):
-            pixmap_loader.stop()
-            if pixmap_loader_thread:
-                pixmap_loader_thread.exit()
-                pixmap_loader_thread.wait()  # type: ignore
+    def __init__(self, accessor: DBAccessor, parent=None):
+        super().__init__(parent)
+        self._accessor = accessor
+        # used as a LIFO stack, 'append' and 'pop' are atomic
+        self._queue: Deque[AssetInfo] = deque()
+        self._loaded_icons: "OrderedDict[Union[int, str], QtGui.QIcon]" = (
+            OrderedDict()
+        )
+        self._requests: Dict[Union[int, str], List[IconRequestCallback]] = {}
+        self._cache_dir = Path(user_cache_dir("bd.loader")) / "icons"
+        makedirs(str(self._cache_dir))
+        self._pixmap_loader = PixmapLoader(self._accessor, self._cache_dir)
+        self._stop_event = threading.Event()
+        # number of the running loaders, guarded by the lock together
+        # with taking the requests from the queue
+        self._active_loaders = 0
+        self._loaders_lock = threading.Lock()
+
+        # emitted from the worker threads, so the slot is invoked
+        # on the thread the manager lives in
+        self.pixmap_loaded.connect(self._on_pixmap_loaded)
+
+        QtCore.QCoreApplication.instance().aboutToQuit.connect(self._stop)
+
+    def _stop(self) -> None:
+        """Drop the pending icon requests, so the exit doesn't wait for them."""
+        self._stop_event.set()
+        self._queue.clear()
+        self._requests.clear()
 
     def request_icon(
         self, callback: IconRequestCallback, asset_info: AssetInfo
@@ -147,27 +248,131 @@ class IconManager(QtCore.QObject):
             callback (IconRequestCallback): model item to set the icon for.
             asset_info (int): asset info to request the icon from.
         """
+        self.request_icons([(callback, asset_info)])
+
+    def request_icons(
+        self, requests: List[Tuple[IconRequestCallback, AssetInfo]]
+    ) -> None:
+        """Send several icon requests to the queue at once.
+
+        Only as many workers as needed are started for the whole batch,
+        instead of one per request.
+
+        Args:
+            requests (List[Tuple[IconRequestCallback, AssetInfo]]): callbacks
+                and asset infos to request the icons from.
+        """
+        if self._stop_event.is_set():
+            return
+
+        queued_count = 0
+        for callback, asset_info in requests:
+            if self._add_request(callback, asset_info):
+                queued_count += 1
+
+        # the running loaders drain the same queue, so only the missing
+        # ones are started
+        with self._loaders_lock:
+            loader_count = min(queued_count, ICON_LOADERS_MAX - self._active_loaders)
+            loader_count = max(loader_count, 0)
+            self._active_loaders += loader_count
+
+        for _ in range(loader_count):
+            _network_pool.start(
+                IconLoadRunnable(
+                    self._pixmap_loader,
+                    self._take_next_request,
+                    self._requests,
+                    self._stop_event,
+                    self.pixmap_loaded,
+                )
+            )
+
+    def _take_next_request(self) -> Optional[AssetInfo]:
+        """Pop the latest queued request, or retire the calling loader.
+
+        Called from the loader threads.
+        """
+        with self._loaders_lock:
+            if self._queue and not self._stop_event.is_set():
+                return self._queue.pop()
+
+            self._active_loaders -= 1
+            return None
+
+    def _add_request(
+        self, callback: IconRequestCallback, asset_info: AssetInfo
+    ) -> bool:
+        """Apply the cached icon or queue the request.
+
+        Returns:
+            bool: True if the icon has to be loaded by a worker.
+        """
         asset_id = asset_info.id
 
-        if asset_id in self._loaded_icons:
-            return callback(self._loaded_icons[asset_id])
+        icon = self._loaded_icons.get(asset_id)
+        if icon is not None:
+            self._loaded_icons.move_to_end(asset_id)
+            callback(icon)
+            return False
+
+        callbacks = self._requests.get(asset_id)
+        if callbacks is not None:
+            # the icon is already being loaded
+            callbacks.append(callback)
+            return False
 
-        if asset_id in self._requests:
+        self._requests[asset_id] = [callback]
+
+        self._queue.append(asset_info)
+
+        return True
+
+    def cancel_icon(
+        self,
+        asset_id: Union[int, str],
+        callback: Optional[IconRequestCallback] = None,
+    ) -> None:
+        """Cancel the icon request.
+
+        Args:
+            asset_id (Union[int, str]): id of the asset the icon was requested for.
+            callback (IconRequestCallback, optional): callback to remove,
+                all the callbacks of the asset are removed if not specified.
+        """
+        callbacks = self._requests.get(asset_id)
+        if callbacks is None:
             return
 
-        self._requests[asset_id] = callback
+        if callback is not None and callback in callbacks:
+            callbacks.remove(callback)
 
-        self._queue.put_nowait(asset_info)
+        if callback is None or not callbacks:
+            del self._requests[asset_id]
 
-    def _on_pixmap_loaded(self, asset_info: AssetInfo, pixmap: QtGui.QPixmap) -> None:
+    def cancel_all(self) -> None:
+        """Cancel all the icon requests, the workers drop the queued ones."""
+        self._queue.clear()
+        self._requests.clear()
+
+    def _cache_icon(
+        self, asset_id: Union[int, str], pixmap: QtGui.QPixmap
+    ) -> QtGui.QIcon:
         icon = QtGui.QIcon(pixmap)
-        self._loaded_icons[asset_info.id] = icon
+        self._loaded_icons[asset_id] = icon
+        if len(self._loaded_icons) > ICON_CACHE_SIZE:
+            # drop the least recently used icon
+            self._loaded_icons.popitem(last=False)
+        return icon
+
+    def _on_pixmap_loaded(self, asset_info: AssetInfo, image: QtGui.QImage) -> None:
+        # the pixmaps are created on the main thread only
+        self._cache_icon(asset_info.id, QtGui.QPixmap.fromImage(image))
         self._apply_icon(asset_info.id)
 
     def _apply_icon(self, asset_id: Union[int, str]) -> None:
         icon = self._loaded_icons[asset_id]
-        callback = self._requests.get(asset_id)
-        if callback:
+        for callback in self._requests.pop(asset_id, ()):
             callback(icon)
 
     def clear_cache(self):
@@ -187,11 +392,20 @@ class RequestRunnable(QtCore.QRunnable):
     def run(self):
         try:
             result = self._request()
-            InvokeMethod(lambda: self._callback(result))
+            # the runnable is auto deleted after it's finished,
+            # so don't let the callback keep the reference to it
+            callback = self._callback
+            invoke_on_main_thread(lambda: callback(result))
         except Exception as e:
             log.exception(f"Unable to make request '{self._request}' due to error:")
 
     @classmethod
-    def execute(cls, request: Callable, callback: Callable) -> None:
+    def execute(
+        cls,
+        request: Callable,
+        callback: Callable,
+        thread_pool: Optional[QtCore.QThreadPool] = None,
+    ) -> None:
+        """Run the request on the network thread pool, unless another is given."""
         runner = cls(request, callback)
-        QtCore.QThreadPool.globalInstance().start(runner)
+        (thread_pool or _network_pool).start(runner)
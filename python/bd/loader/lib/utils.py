@@ -1,8 +1,17 @@
 import os
 import errno
-from typing import Optional
+import time
+from dataclasses import replace
+from functools import lru_cache
+from typing import Optional, Tuple
 
 from PySide2 import QtCore, QtGui, QtWidgets
+import arrow
+
+from .data_models import AssetDetails
+
+# seconds after which the humanized dates are considered stale
+HUMANIZED_MAX_AGE = 60.0
 
 
 def makedirs(path):
@@ -31,6 +40,65 @@ def open_directory(path):
     QtGui.QDesktopServices.openUrl(QtCore.QUrl(directory))
 
 
+def read_image(data: bytes, size: Optional[QtCore.QSize] = None) -> QtGui.QImage:
+    """Decode the image from the encoded *data*.
+
+    If *size* is given, the image is scaled to it while decoding,
+    which is much cheaper than decoding the full image and scaling it after.
+    """
+    # wrap the data without copying it, it's alive until the image is read
+    buffer = QtCore.QBuffer()
+    buffer.setData(QtCore.QByteArray.fromRawData(data))
+
+    reader = QtGui.QImageReader(buffer)
+    reader.setAutoTransform(True)
+    if size is not None:
+        reader.setScaledSize(size)
+
+    return reader.read()
+
+
+@lru_cache(maxsize=1024)
+def _humanize(value, minute_bucket: int) -> str:
+    return arrow.get(value).humanize()
+
+
+def humanize(value) -> str:
+    """Return the humanized *value* relative to now (e.g. "2 hours ago").
+
+    The result is reused within the same minute, so the dates shared by
+    many assets are parsed only once.
+    """
+    return _humanize(value, int(time.time()) // 60)
+
+
+def humanize_asset_details(asset_details: AssetDetails) -> AssetDetails:
+    """Return a copy of *asset_details* with the humanized dates filled in.
+
+    Meant to be called in a worker thread, so that the main thread
+    doesn't have to parse the dates.
+    """
+    return replace(
+        asset_details,
+        created_humanized=humanize(asset_details.created_at),
+        modified_humanized=humanize(asset_details.modified_at),
+        humanized_at=time.monotonic(),
+    )
+
+
+def get_humanized_dates(asset_details: AssetDetails) -> Tuple[str, str]:
+    """Return the humanized created and modified dates of *asset_details*.
+
+    The precomputed values are used unless they're older than
+    HUMANIZED_MAX_AGE.
+    """
+    humanized_at = asset_details.humanized_at
+    if humanized_at is None or time.monotonic() - humanized_at > HUMANIZED_MAX_AGE:
+        return humanize(asset_details.created_at), humanize(asset_details.modified_at)
+
+    return asset_details.created_humanized, asset_details.modified_humanized
+
+
 def select_directory(title):
     root_dir = QtWidgets.QFileDialog.getExistingDirectory(None, title)
     if root_dir:
@@ -1,22 +1,28 @@
+import time
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, List, Optional
 
 from PySide2 import QtWidgets, QtCore, QtGui, QtSvg
-import arrow
 
 from .asset_preview import AssetPreviewWidget
 from ..data_models import AssetDetails
+from ..utils import get_humanized_dates
+
+LOADER_SIZE = 64
 
 
 class ResizeSyncFilter(QtCore.QObject):
-    def __init__(self, parent=None):
+    """Resizes its parent widget to the size of the watched widget."""
+
+    def __init__(self, parent: QtWidgets.QWidget):
         super().__init__(parent)
+        self._target = parent
 
     def eventFilter(self, obj: QtCore.QObject, event: QtCore.QEvent) -> bool:
         if event.type() == QtCore.QEvent.Resize:
-            self.parent().resize(event.size())
+            self._target.resize(event.size())
 
         return super().eventFilter(obj, event)
 
@@ -25,24 +31,99 @@ class LoadingOverlay(QtWidgets.QWidget):
     def __init__(self, parent: QtWidgets.QWidget, loader_renderer: QtSvg.QSvgRenderer):
         super().__init__(parent)
         self._loader_renderer = loader_renderer
+        self._is_renderer_connected = False
+        self._frames: List[QtGui.QPixmap] = []
+        self._frames_per_second = 1
         self._init_ui()
         self._init_connections()
 
     def _init_ui(self):
         self.setObjectName("LoadingOverlay")
 
+        self._resize_filter = ResizeSyncFilter(self)
+
+        # the renderer might request repaints more often than it's worth it
+        self._update_timer = QtCore.QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(33)
+
     def _init_connections(self):
-        self.parent().installEventFilter(ResizeSyncFilter(self))
-        self._loader_renderer.repaintNeeded.connect(self.update)
+        self._update_timer.timeout.connect(self.update)
+
+    def _schedule_update(self) -> None:
+        if not self._update_timer.isActive():
+            self._update_timer.start()
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        # follow the parent size and repaint the loader animation
+        # only while the overlay is visible
+        parent = self.parent()
+        parent.installEventFilter(self._resize_filter)
+        self.resize(parent.size())
+
+        if not self._is_renderer_connected:
+            self._loader_renderer.repaintNeeded.connect(self._schedule_update)
+            self._is_renderer_connected = True
+
+        super().showEvent(event)
+
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        self.parent().removeEventFilter(self._resize_filter)
+
+        if self._is_renderer_connected:
+            self._loader_renderer.repaintNeeded.disconnect(self._schedule_update)
+            self._is_renderer_connected = False
+
+        super().hideEvent(event)
+
+    def _render_frames(self) -> None:
+        """Rasterize all the frames of the loader animation once."""
+        renderer = self._loader_renderer
+
+        frame_count = 1
+        self._frames_per_second = max(renderer.framesPerSecond(), 1)
+        if renderer.animated():
+            frame_count = max(
+                renderer.animationDuration() * self._frames_per_second // 1000, 1
+            )
+
+        pixel_ratio = self.devicePixelRatioF()
+        size = int(LOADER_SIZE * pixel_ratio)
+
+        current_frame = renderer.currentFrame()
+
+        for frame in range(frame_count):
+            if frame_count > 1:
+                renderer.setCurrentFrame(frame)
+
+            pixmap = QtGui.QPixmap(size, size)
+            pixmap.fill(QtCore.Qt.transparent)
+
+            painter = QtGui.QPainter(pixmap)
+            renderer.render(painter, QtCore.QRectF(0, 0, size, size))
+            painter.end()
+
+            pixmap.setDevicePixelRatio(pixel_ratio)
+            self._frames.append(pixmap)
+
+        if frame_count > 1:
+            renderer.setCurrentFrame(current_frame)
 
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:
         super().paintEvent(event)
 
+        bounds = QtCore.QRect(0, 0, LOADER_SIZE, LOADER_SIZE)
+        bounds.moveCenter(self.rect().center())
+        if not event.rect().intersects(bounds):
+            return
+
+        if not self._frames:
+            self._render_frames()
+
+        index = int(time.monotonic() * self._frames_per_second) % len(self._frames)
+
         painter = QtGui.QPainter(self)
-        rect = self.rect()
-        bounds = QtCore.QRect(0, 0, 64, 64)
-        bounds.moveCenter(rect.center())
-        self._loader_renderer.render(painter, bounds)
+        painter.drawPixmap(bounds, self._frames[index])
 
 
 class AssetDetailItem(QtWidgets.QWidget):
@@ -57,16 +138,11 @@ class AssetDetailItem(QtWidgets.QWidget):
 
     def _init_widgets(self):
         self._name_label = QtWidgets.QLabel(self._name)
-        self._name_label.setStyleSheet("color: grey; font-size: 11px")
+        self._name_label.setObjectName("AssetDetailName")
         self._value_label = QtWidgets.QLabel(self._value)
+        self._value_label.setObjectName("AssetDetailValue")
         self._value_label.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
         self._value_label.setMinimumHeight(32)
-        self._value_label.setStyleSheet(
-            "background-color: hsv(0, 0, 45); "
-            "border: 1px solid hsv(0, 0, 52); "
-            "border-radius: 4px; "
-            "padding-left: 8px"
-        )
 
     def _init_layout(self):
         layout = QtWidgets.QVBoxLayout(self)
@@ -76,14 +152,21 @@ class AssetDetailItem(QtWidgets.QWidget):
         layout.addWidget(self._value_label)
 
     def set_value(self, value):
+        # avoid relayouting the label if nothing has changed
+        if value == self._value:
+            return
+
         self._value = value
         self._value_label.setText(value)
 
     def clear(self):
+        self._value = None
         self._value_label.clear()
 
 
 class AssetDetailsWidget(QtWidgets.QWidget):
+    EMPTY_TEXT = "Select Asset to View the Details"
+
     class State(Enum):
         Empty = 0
         Loading = 1
@@ -91,7 +174,6 @@ class AssetDetailsWidget(QtWidgets.QWidget):
 
     def __init__(self, loader_renderer: QtSvg.QSvgRenderer, parent=None):
         super().__init__(parent)
-        self._labels = {}
         self._state = self.State.Empty
         self._current_asset_details: Optional[AssetDetails] = None
         self._loader_renderer = loader_renderer
@@ -99,8 +181,20 @@ class AssetDetailsWidget(QtWidgets.QWidget):
         self._init_widgets()
 
     def _init_widgets(self):
-        main_layout = QtWidgets.QVBoxLayout(self)
-        main_layout.setContentsMargins(0, 0, 0, 0)  # type: ignore
+        self._main_layout = QtWidgets.QVBoxLayout(self)
+        self._main_layout.setContentsMargins(0, 0, 0, 0)  # type: ignore
+
+        # the details widgets are built on the first asset selection
+        self._group: Optional[QtWidgets.QFrame] = None
+
+        self._empty_text_options = QtGui.QTextOption()
+        self._empty_text_options.setWrapMode(QtGui.QTextOption.WordWrap)
+        self._empty_text_options.setAlignment(QtCore.Qt.AlignCenter)
+        self._empty_pen = QtGui.QPen(QtGui.QColor("grey"))
+
+    def _ensure_built(self) -> None:
+        if self._group is not None:
+            return
 
         self._group = QtWidgets.QFrame(self)
         self._group.hide()
@@ -117,23 +211,25 @@ class AssetDetailsWidget(QtWidgets.QWidget):
         details_layout.setContentsMargins(0, 0, 0, 0)
         details_layout.setSpacing(12)
 
-        row = -1
-        for i, name in enumerate(["name", "version", "created", "modified"]):
-            details_item = AssetDetailItem(name.title(), "...")
-
-            column = i % 2
-
-            if i % 2 == 0:
-                row += 1
+        self._name_item = AssetDetailItem("Name", "...")
+        self._version_item = AssetDetailItem("Version", "...")
+        self._created_item = AssetDetailItem("Created", "...")
+        self._modified_item = AssetDetailItem("Modified", "...")
+        self._detail_items = (
+            self._name_item,
+            self._version_item,
+            self._created_item,
+            self._modified_item,
+        )
 
-            details_layout.addWidget(details_item, row, column)
-            self._labels[name] = details_item
+        for i, details_item in enumerate(self._detail_items):
+            details_layout.addWidget(details_item, i // 2, i % 2)
 
         group_layout.addWidget(self._preview)
         group_layout.addWidget(self._details)
         group_layout.addStretch(1)
 
-        main_layout.addWidget(self._group)
+        self._main_layout.addWidget(self._group)
 
         self._loading_overlay = LoadingOverlay(self._preview, self._loader_renderer)
         self._loading_overlay.hide()
@@ -148,16 +244,21 @@ class AssetDetailsWidget(QtWidgets.QWidget):
             return
 
         if state == self.State.Ready:
+            self._ensure_built()
             self._loading_overlay.hide()
             self._group.show()
             # self._loader_renderer.repaintNeeded.disconnect(self.update)
         elif state == self.State.Empty:
-            self._group.hide()
+            if self._group is not None:
+                self._group.hide()
+            self._current_asset_details = None
         else:
+            self._ensure_built()
             self._group.show()
+            self._current_asset_details = None
 
             self._preview.clear()
-            for item in self._labels.values():
+            for item in self._detail_items:
                 item.clear()
 
             self._loading_overlay.show()
@@ -169,33 +270,58 @@ class AssetDetailsWidget(QtWidgets.QWidget):
     def reload(self, asset_details: Optional[AssetDetails] = None):
         if not asset_details:
             self.state = self.State.Empty
-        else:
-            self._labels["name"].set_value(asset_details.fullname)
-            self._labels["version"].set_value(str(asset_details.version))
-            self._labels["created"].set_value(
-                arrow.get(asset_details.created_at).humanize()
-            )
-            self._labels["modified"].set_value(
-                arrow.get(asset_details.modified_at).humanize()
-            )
+            return
 
-            thumbnail_pixmap = asset_details.thumbnail
-            if thumbnail_pixmap:
-                self._preview.set_pixmap(thumbnail_pixmap)
-            else:
-                self._preview.clear()
+        # nothing to do if the same version of the asset is already displayed
+        current = self._current_asset_details
+        if (
+            self._state == self.State.Ready
+            and current is not None
+            and current.fullname == asset_details.fullname
+            and current.version == asset_details.version
+        ):
+            return
+
+        self._current_asset_details = asset_details
+        self._ensure_built()
+
+        # update the whole widget once after all the values are set
+        self.setUpdatesEnabled(False)
+        try:
+            self._name_item.set_value(asset_details.fullname)
+            self._version_item.set_value(str(asset_details.version))
+            created, modified = get_humanized_dates(asset_details)
+            self._created_item.set_value(created)
+            self._modified_item.set_value(modified)
+
+            asset_key = f"{asset_details.fullname}:{asset_details.version}"
+
+            # don't convert the same thumbnail to a pixmap once again
+            if not self._preview.has_pixmap(asset_key):
+                thumbnail_pixmap = asset_details.thumbnail
+                if asset_details.thumbnail_image is not None:
+                    thumbnail_pixmap = QtGui.QPixmap.fromImage(
+                        asset_details.thumbnail_image
+                    )
+
+                if thumbnail_pixmap:
+                    self._preview.set_pixmap(thumbnail_pixmap, asset_key)
+                else:
+                    self._preview.clear()
 
             self.state = self.State.Ready
+        finally:
+            self.setUpdatesEnabled(True)
 
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:
         if self._state == self.State.Empty:
-            painter = QtGui.QPainter(self)
-            painter.setPen(QtGui.QColor("grey"))
+            region = event.region()
+            if region.isEmpty():
+                return
 
-            options = QtGui.QTextOption()
-            options.setWrapMode(QtGui.QTextOption.WordWrap)
-            options.setAlignment(QtCore.Qt.AlignCenter)
-
-            painter.drawText(self.rect(), "Select Asset to View the Details", options)
+            painter = QtGui.QPainter(self)
+            painter.setClipRegion(region)
+            painter.setPen(self._empty_pen)
+            painter.drawText(self.rect(), self.EMPTY_TEXT, self._empty_text_options)
         else:
             super().paintEvent(event)
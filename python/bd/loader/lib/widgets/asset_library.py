@@ -1,6 +1,8 @@
 import os
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Union
+from typing import Optional, Tuple, Union
 
 from PySide2 import QtWidgets, QtCore, QtGui, QtSvg
 
@@ -12,7 +14,43 @@ from ..database.accessor import Accessor
 
 from ..data_models import AssetInfo, AssetDetails
 from .asset_selector import AssetSelectorWidget, Item, EntityType, ItemRoles
+from .asset_selector import unpack_item_state
 from .asset_details import AssetDetailsWidget
+from ..utils import HUMANIZED_MAX_AGE
+
+
+# the styles of all the child widgets are parsed once here
+STYLESHEET = """
+QLabel#AssetDetailName {
+    color: grey;
+    font-size: 11px;
+}
+QLabel#AssetDetailValue {
+    background-color: hsv(0, 0, 45);
+    border: 1px solid hsv(0, 0, 52);
+    border-radius: 4px;
+    padding-left: 8px;
+}
+QLineEdit#AssetFilter {
+    padding-left: 8px;
+}
+QLineEdit#AssetFilter[invalid="true"] {
+    border: 1px solid #e74c3c;
+}
+"""
+
+# size of the global pixmap cache (in KB) which keeps the scaled thumbnails
+PIXMAP_CACHE_LIMIT = 10240
+
+# maximum number of the received asset details kept in memory,
+# each of them holds a thumbnail image
+ASSET_DETAILS_CACHE_SIZE = 128
+
+# seconds after which the details are requested again, so the newly
+# published versions show up, same as the humanized dates get outdated
+ASSET_DETAILS_MAX_AGE = HUMANIZED_MAX_AGE
+
+_DetailsItem = Tuple[float, AssetDetails]
 
 
 class AssetLibraryWidget(QtWidgets.QDialog):
@@ -20,21 +58,34 @@ class AssetLibraryWidget(QtWidgets.QDialog):
         super().__init__(parent)
 
         self._current_asset_data = None
+        # id of the latest asset details request
+        self._details_request_id = 0
+        # the received details and the time (time.monotonic) they were received
+        self._loaded_asset_details: "OrderedDict[Union[int, str], _DetailsItem]" = (
+            OrderedDict()
+        )
+        self._is_splitter_sized = False
 
         self._db_accessor = Accessor()
 
+        if QtGui.QPixmapCache.cacheLimit() < PIXMAP_CACHE_LIMIT:
+            QtGui.QPixmapCache.setCacheLimit(PIXMAP_CACHE_LIMIT)
+
         self._loader_renderer = QtSvg.QSvgRenderer(":/svg/loader.svg", self)
 
         self.setWindowTitle("Loader")
         self.setWindowIcon(qta.icon("ei.book", color=QtGui.QColor("#1abc9c")))
         self.setWindowFlags(self.windowFlags() ^ QtCore.Qt.WindowContextHelpButtonHint)
+        self.setStyleSheet(STYLESHEET)
         # self.setMinimumSize(900, 600)
-        self.resize(900, 600)
 
         self._init_widgets()
         self._init_layout()
         self._init_connections()
 
+        # resize once the layout exists, so it's propagated only once
+        self.resize(900, 600)
+
     def _init_widgets(self):
         project = get_context().project
 
@@ -61,6 +112,7 @@ class AssetLibraryWidget(QtWidgets.QDialog):
         splitter = QtWidgets.QSplitter()
         splitter.setOrientation(QtCore.Qt.Horizontal)
         splitter.setContentsMargins(0, 0, 0, 0)
+        self._splitter = splitter
 
         widget = QtWidgets.QWidget()
         layout = QtWidgets.QVBoxLayout(widget)
@@ -74,19 +126,50 @@ class AssetLibraryWidget(QtWidgets.QDialog):
         layout.addWidget(self._asset_details)
         splitter.addWidget(widget)
 
-        splitter.setSizes([self.width() / 2, self.width() / 2])
-
         main_layout.addWidget(splitter)
 
         # main_layout.addLayout(dialogbutton_layout)
 
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        # split the dialog in halves when its final size is known
+        if not self._is_splitter_sized:
+            half_width = self.width() // 2
+            self._splitter.setSizes([half_width, half_width])
+            self._is_splitter_sized = True
+
+        super().showEvent(event)
+
     def _init_connections(self):
         self._asset_selector.item_clicked.connect(self._on_item_clicked)
 
         self._pb_cancel.clicked.connect(self.close)
 
+    def _get_loaded_asset_details(
+        self, asset_id: Union[int, str]
+    ) -> Optional[AssetDetails]:
+        item = self._loaded_asset_details.get(asset_id)
+        if item is None:
+            return None
+
+        received_at, asset_details = item
+        if time.monotonic() - received_at > ASSET_DETAILS_MAX_AGE:
+            del self._loaded_asset_details[asset_id]
+            return None
+
+        self._loaded_asset_details.move_to_end(asset_id)
+        return asset_details
+
+    def _add_loaded_asset_details(
+        self, asset_id: Union[int, str], asset_details: AssetDetails
+    ) -> None:
+        self._loaded_asset_details[asset_id] = (time.monotonic(), asset_details)
+        self._loaded_asset_details.move_to_end(asset_id)
+        if len(self._loaded_asset_details) > ASSET_DETAILS_CACHE_SIZE:
+            # drop the least recently used details
+            self._loaded_asset_details.popitem(last=False)
+
     def _on_item_clicked(self, item: Item):
-        entity_type = item.data(ItemRoles.EntityTypeRole)
+        entity_type = unpack_item_state(item.data(ItemRoles.PackedRole))[0]
 
         if entity_type != EntityType.AssetName:
             self._asset_details.reload()
@@ -94,8 +177,12 @@ class AssetLibraryWidget(QtWidgets.QDialog):
             asset_info: AssetInfo = item.data(ItemRoles.DataRole)
             self._current_asset_info = asset_info
 
-            if asset_info.details is not None:
-                self._asset_details.reload(asset_info.details)
+            asset_details = asset_info.details or self._get_loaded_asset_details(
+                asset_info.id
+            )
+
+            if asset_details is not None:
+                self._asset_details.reload(asset_details)
 
             else:
                 self._asset_details.state = AssetDetailsWidget.State.Loading
@@ -103,7 +190,8 @@ class AssetLibraryWidget(QtWidgets.QDialog):
                 def _on_asset_details_received(
                     asset_details: Union[AssetDetails, None]
                 ):
-                    asset_info.details = asset_details
+                    if asset_details is not None:
+                        self._add_loaded_asset_details(asset_info.id, asset_details)
 
                     # 'self._current_asset_info' is alway the latest,
                     # while 'asset_info' is a closure object, created when
@@ -115,6 +203,9 @@ class AssetLibraryWidget(QtWidgets.QDialog):
 
                     self._asset_details.reload(asset_details)
 
+                self._details_request_id += 1
                 self._db_accessor.request_asset_details(
-                    asset_info, _on_asset_details_received
+                    asset_info,
+                    _on_asset_details_received,
+                    request_id=self._details_request_id,
                 )
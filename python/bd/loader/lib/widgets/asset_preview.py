@@ -1,21 +1,35 @@
-from typing import Union
+from typing import Optional, Tuple, Union
 from PySide2 import QtWidgets, QtCore, QtGui
 
+BACKGROUND_COLOR = QtGui.QColor.fromHsv(0, 0, 45)
+BORDER_COLOR = QtGui.QColor.fromHsv(0, 0, 52)
+BORDER_RADIUS = 4.0
+
+# milliseconds after the last resize when the pixmap is scaled smoothly
+SMOOTH_SCALE_DELAY = 150
+
 
 class AssetPreviewWidget(QtWidgets.QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._pixmap: Union[QtGui.QPixmap, None] = None
+        self._asset_key: Optional[str] = None
+        self._scaled_pixmap: Union[QtGui.QPixmap, None] = None
+        self._scaled_pixmap_key: Union[Tuple[int, int, int, bool], None] = None
+        # the interim sizes are scaled fast, the final one smoothly
+        self._is_resizing = False
+        self._smooth_scale_timer = QtCore.QTimer(self)
+        self._smooth_scale_timer.setSingleShot(True)
+        self._smooth_scale_timer.setInterval(SMOOTH_SCALE_DELAY)
+        self._smooth_scale_timer.timeout.connect(self._on_resize_finished)
         self.setSizePolicy(
             QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding
         )
         self.setAutoFillBackground(False)
-        self.setAttribute(QtCore.Qt.WA_StyledBackground, True)
-        self.setStyleSheet(
-            "background-color: hsv(0, 0, 45); "
-            "border: 1px solid hsv(0, 0, 52); "
-            "border-radius: 4px;"
-        )
+        # the whole widget is painted in paintEvent, including the background
+        self.setAttribute(QtCore.Qt.WA_OpaquePaintEvent, True)
+        self._border_pen = QtGui.QPen(BORDER_COLOR)
+        self._background_brush = QtGui.QBrush(BACKGROUND_COLOR)
         self.setMinimumHeight(128)
         self.setMinimumWidth(128)
 
@@ -24,25 +38,106 @@ class AssetPreviewWidget(QtWidgets.QWidget):
 
     def clear(self):
         self._pixmap = None
+        self._asset_key = None
+        self._scaled_pixmap = None
+        self._scaled_pixmap_key = None
         self.update()
 
-    def set_pixmap(self, pixmap):
+    def has_pixmap(self, asset_key: str) -> bool:
+        """Tell whether the pixmap of the asset is already previewed."""
+        return self._pixmap is not None and asset_key == self._asset_key
+
+    def set_pixmap(self, pixmap, asset_key: Optional[str] = None):
+        """Set the pixmap to preview.
+
+        Args:
+            pixmap: the full size pixmap.
+            asset_key: an identifier of the asset the pixmap belongs to. If
+                specified, the scaled pixmaps are kept in the global
+                QPixmapCache and reused when the asset gets previewed again.
+        """
+        # the pixmaps converted from the same image differ, so the asset key
+        # tells whether the content is the same
+        if (
+            pixmap is not None
+            and self._pixmap is not None
+            and asset_key == self._asset_key
+            and (asset_key is not None or pixmap.cacheKey() == self._pixmap.cacheKey())
+        ):
+            return
+
         self._pixmap = pixmap
-        self.repaint()
+        self._asset_key = asset_key
+        self._scaled_pixmap = None
+        self._scaled_pixmap_key = None
+        self.update()
+
+    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
+        self._is_resizing = True
+        self._smooth_scale_timer.start()
+        super().resizeEvent(event)
+
+    def _on_resize_finished(self) -> None:
+        self._is_resizing = False
+        self.update()
+
+    def _get_scaled_pixmap(self, size: QtCore.QSize) -> QtGui.QPixmap:
+        # scale the pixmap again only if it or the widget size has changed
+        is_smooth = not self._is_resizing
+        key = (self._pixmap.cacheKey(), size.width(), size.height(), is_smooth)
+        if key != self._scaled_pixmap_key:
+            self._scaled_pixmap = self._find_or_scale_pixmap(size, is_smooth)
+            self._scaled_pixmap_key = key
+
+        return self._scaled_pixmap
+
+    def _find_or_scale_pixmap(
+        self, size: QtCore.QSize, is_smooth: bool = True
+    ) -> QtGui.QPixmap:
+        if not is_smooth:
+            # the interim sizes are dropped right away, so don't cache them
+            return self._pixmap.scaled(
+                size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.FastTransformation
+            )
+
+        if self._asset_key is None:
+            return self._pixmap.scaled(
+                size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation
+            )
+
+        cache_key = f"{self._asset_key}:{size.width()}x{size.height()}"
+
+        pixmap = QtGui.QPixmap()
+        if not QtGui.QPixmapCache.find(cache_key, pixmap):
+            # scaled once per size, so it's worth the quality
+            pixmap = self._pixmap.scaled(
+                size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation
+            )
+            QtGui.QPixmapCache.insert(cache_key, pixmap)
+
+        return pixmap
 
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:
-        super().paintEvent(event)
+        painter = QtGui.QPainter(self)
 
-        if self._pixmap is not None:
-            painter = QtGui.QPainter(self)
+        rect = self.rect()
+        # the corners outside of the rounded frame show the parent background
+        painter.fillRect(rect, self.palette().color(QtGui.QPalette.Window))
+
+        painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
+        painter.setPen(self._border_pen)
+        painter.setBrush(self._background_brush)
+        painter.drawRoundedRect(
+            QtCore.QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5),
+            BORDER_RADIUS,
+            BORDER_RADIUS,
+        )
+        painter.setRenderHint(QtGui.QPainter.Antialiasing, False)
 
-            rect = self.rect()
+        if self._pixmap is not None:
             size = self.size().shrunkBy(QtCore.QMargins(2, 2, 2, 2))
-            self.style().drawItemPixmap(
-                painter,
-                rect,
-                QtCore.Qt.AlignCenter,
-                self._pixmap.scaled(
-                    size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation
-                ),
-            )
+            scaled_pixmap = self._get_scaled_pixmap(size)
+
+            target = scaled_pixmap.rect()
+            target.moveCenter(self.rect().center())
+            painter.drawPixmap(target, scaled_pixmap)
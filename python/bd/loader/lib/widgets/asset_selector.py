@@ -1,9 +1,10 @@
 from pathlib import Path
 import re
+import sys
+from collections import OrderedDict, defaultdict, deque
 from enum import Enum
-from functools import partial
-from typing import Any, Dict, List, Tuple, Union
-import weakref
+from functools import lru_cache, partial
+from typing import Any, Deque, Dict, List, Tuple, Union
 from typing import Callable, Iterator, Optional, overload
 
 from PySide2 import QtWidgets, QtCore, QtGui, QtSvg
@@ -14,9 +15,63 @@ from bd.context import Project
 from bd.hooks.main import execute as execute_hook
 from bd.hooks.exceptions import HooksNotLoadedError, HookNotFoundError
 
-from ..threading_utils import IconManager
+from ..threading_utils import IconManager, RequestRunnable
 from ..data_models import AssetInfo
-from ..database.base import DBAccessor
+from ..database.base import DBAccessor, compile_regex, regex_engine
+
+# number of assets requested at once when the asset type is expanded,
+# the next pages are requested when the view is scrolled to the bottom
+ASSETS_PAGE_SIZE = 200
+
+# number of the regex results inserted at once, the control is given back
+# to the event loop between the chunks, so the view stays responsive
+ASSETS_CHUNK_SIZE = 200
+
+# number of the recently active projects whose assets are kept,
+# so switching back to them shows the tree right away
+PROJECT_CACHE_SIZE = 4
+
+FOLDER_COLOR = "#1abc9c"
+
+# milliseconds after the last keystroke when the filter is applied
+FILTER_DELAY = 200
+
+# asset types and their loaded assets, None if the assets aren't loaded yet
+ProjectAssets = Dict[str, Optional[List[AssetInfo]]]
+
+_NUMBER_REGEX = re.compile(r"(\d*\.\d+|\d+)")
+
+
+# shared by all the proxy models, the least recently sorted keys are dropped
+@lru_cache(maxsize=4096)
+def _human_key(key: str) -> Tuple[Union[str, float], ...]:
+    """Return the natural sort key of *key*, the numbers are compared by value."""
+    parts = _NUMBER_REGEX.split(key)
+    return tuple(
+        (e.casefold() if i & 1 == 0 else float(e)) for i, e in enumerate(parts)
+    )
+
+
+def _group_assets_by_type(assets: List[AssetInfo]) -> Dict[str, List[AssetInfo]]:
+    assets_by_type: Dict[str, List[AssetInfo]] = defaultdict(list)
+    for asset in assets:
+        assets_by_type[asset.type].append(asset)
+
+    return assets_by_type
+
+
+@lru_cache(maxsize=None)
+def _themed_icon(
+    name: str, color: Optional[str] = None, scale: Optional[float] = None
+) -> QtGui.QIcon:
+    """Return the qtawesome icon, shared between all the views."""
+    options = {}
+    if color is not None:
+        options["color"] = QtGui.QColor(color)
+    if scale is not None:
+        options["scale_factor"] = scale
+
+    return qta.icon(name, **options)
 
 
 def untokenize(path):
@@ -36,96 +91,169 @@ class LoadingStates(Enum):
 
 
 class ItemRoles:
-    ExpandableRole: int = QtCore.Qt.UserRole + 500
-    EntityTypeRole: int = QtCore.Qt.UserRole + 501
     DataRole: int = QtCore.Qt.UserRole + 502
     KeyRole: int = QtCore.Qt.UserRole + 503
-    LoadingStateRole: int = QtCore.Qt.UserRole + 504
+    NextOffsetRole: int = QtCore.Qt.UserRole + 505
+    FolderRole: int = QtCore.Qt.UserRole + 506
+    # entity type, expandable flag and loading state packed into one integer
+    PackedRole: int = QtCore.Qt.UserRole + 510
+
+
+_ENTITY_TYPES = tuple(EntityType)
+_LOADING_STATES = tuple(LoadingStates)
+
+
+def pack_item_state(
+    entity_type: EntityType, is_expandable: bool, loading_state: LoadingStates
+) -> int:
+    """Pack the small fixed item roles into the value of the PackedRole."""
+    return entity_type.value | (is_expandable << 2) | (loading_state.value << 3)
+
+
+def unpack_item_state(
+    value: Optional[int],
+) -> Tuple[EntityType, bool, LoadingStates]:
+    """Unpack the value of the PackedRole, the missing value is all zeros."""
+    value = value or 0
+    return (
+        _ENTITY_TYPES[value & 3],
+        bool(value & 4),
+        _LOADING_STATES[(value >> 3) & 3],
+    )
+
+
+def set_loading_state(
+    item: QtGui.QStandardItem, loading_state: LoadingStates
+) -> None:
+    entity_type, is_expandable, _ = unpack_item_state(item.data(ItemRoles.PackedRole))
+    item.setData(
+        pack_item_state(entity_type, is_expandable, loading_state),
+        ItemRoles.PackedRole,
+    )
+
+
+_DECORATION_ROLE = QtCore.Qt.DecorationRole
+_SIZE_HINT_ROLE = QtCore.Qt.SizeHintRole
 
 
 class ItemModel(QtGui.QStandardItemModel):
     def __init__(self, view: QtWidgets.QTreeView, accessor: DBAccessor):
         super().__init__(view)
         self._icon_manager = IconManager(accessor)
-        self._icon_manager.start()
-        self._asset_icon = qta.icon("fa5s.image")
+        self._asset_icon = _themed_icon("fa5s.image")
+        # returned by value, so the same instances are safe to share
+        self._default_size = QtCore.QSize(32, 32)
+        self._asset_size = QtCore.QSize(32, 64)
+        self._visible_check: Optional[Callable[[QtCore.QModelIndex], bool]] = None
+        # the icons requested while painting are sent to the manager at once
+        self._pending_icon_requests: List[
+            Tuple[Callable[[Union[QtGui.QIcon, None]], None], AssetInfo]
+        ] = []
+
+    def set_visible_check(
+        self, visible_check: Optional[Callable[[QtCore.QModelIndex], bool]]
+    ) -> None:
+        """Set the callable telling whether the item at the index is visible.
+
+        The icons are requested only for the visible items, the rest are
+        requested once they're scrolled into the view and painted.
+        """
+        self._visible_check = visible_check
 
     def hasChildren(self, index: QtCore.QModelIndex) -> bool:
-        if self.data(index, ItemRoles.ExpandableRole):
+        if unpack_item_state(self.data(index, ItemRoles.PackedRole))[1]:
             return True
 
         return super().hasChildren(index)
 
     def data(self, index: QtCore.QModelIndex, role: int) -> Any:
-        if index.isValid() and index.column() == 0:
-            if role == QtCore.Qt.DecorationRole:
-                item: Item = self.itemFromIndex(index)
-
-                if not item.icon():
-                    if (
-                        item.data(ItemRoles.LoadingStateRole)
-                        != LoadingStates.InProgress
-                        and item.data(ItemRoles.EntityTypeRole) == EntityType.AssetName
-                    ):
-                        asset_info = item.data(ItemRoles.DataRole)
-
-                        # if asset_info.icon is None:
-                        #     item.setData(
-                        #         LoadingStates.Loaded, ItemRoles.LoadingStateRole
-                        #     )
-                        #     return self._asset_icon
-
-                        item.setData(
-                            LoadingStates.InProgress, ItemRoles.LoadingStateRole
-                        )
+        # most of the roles are served by the base class as they are
+        if role != _DECORATION_ROLE and role != _SIZE_HINT_ROLE:
+            return super().data(index, role)
 
-                        def _on_loaded(icon: Union[QtGui.QIcon, None]):
-                            if icon and not icon.isNull():
-                                item.setIcon(icon)
-                            else:
-                                item.setIcon(self._asset_icon)
+        if not index.isValid() or index.column() != 0:
+            return super().data(index, role)
 
-                            item.setData(
-                                LoadingStates.Loaded, ItemRoles.LoadingStateRole
-                            )
+        item: Item = self.itemFromIndex(index)
+        entity_type, _, loading_state = unpack_item_state(
+            item.data(ItemRoles.PackedRole)
+        )
 
-                        self._icon_manager.request_icon(_on_loaded, asset_info)
+        if role == _SIZE_HINT_ROLE:
+            if entity_type == EntityType.AssetName:
+                return self._asset_size
+
+            return self._default_size
+
+        if not item.icon():
+            if (
+                loading_state != LoadingStates.InProgress
+                and entity_type == EntityType.AssetName
+                and (self._visible_check is None or self._visible_check(index))
+            ):
+                asset_info = item.data(ItemRoles.DataRole)
+
+                # if asset_info.icon is None:
+                #     set_loading_state(item, LoadingStates.Loaded)
+                #     return self._asset_icon
+
+                set_loading_state(item, LoadingStates.InProgress)
+
+                # the model might be cleared before the icon is loaded,
+                # so the item is resolved only if it still exists
+                def _on_loaded(
+                    icon: Union[QtGui.QIcon, None],
+                    _index=QtCore.QPersistentModelIndex(index),
+                    _fallback_icon=self._asset_icon,
+                    _model=self,
+                ):
+                    if not _index.isValid():
+                        return
+
+                    loaded_item = _model.itemFromIndex(QtCore.QModelIndex(_index))
+                    if icon and not icon.isNull():
+                        loaded_item.setIcon(icon)
+                    else:
+                        loaded_item.setIcon(_fallback_icon)
+
+                    set_loading_state(loaded_item, LoadingStates.Loaded)
+
+                if not self._pending_icon_requests:
+                    QtCore.QTimer.singleShot(0, self._flush_icon_requests)
+                self._pending_icon_requests.append((_on_loaded, asset_info))
 
-            elif role == QtCore.Qt.SizeHintRole:
-                size = QtCore.QSize(32, 32)
+        return super().data(index, role)
 
-                item: Item = self.itemFromIndex(index)
-                if item.data(ItemRoles.EntityTypeRole) == EntityType.AssetName:
-                    size.setHeight(64)
+    def _flush_icon_requests(self) -> None:
+        requests, self._pending_icon_requests = self._pending_icon_requests, []
+        self._icon_manager.request_icons(requests)
 
-                return size
+    def cancel_icon_requests(
+        self, asset_infos: Optional[List[AssetInfo]] = None
+    ) -> None:
+        """Cancel the icon requests of the assets, or all of them if not given."""
+        if asset_infos is None:
+            self._pending_icon_requests.clear()
+            self._icon_manager.cancel_all()
+            return
 
-        return super().data(index, role)
+        asset_ids = {asset_info.id for asset_info in asset_infos}
+        self._pending_icon_requests = [
+            request
+            for request in self._pending_icon_requests
+            if request[1].id not in asset_ids
+        ]
+        for asset_id in asset_ids:
+            self._icon_manager.cancel_icon(asset_id)
 
 
 class ProxyModel(QtCore.QSortFilterProxyModel):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-    @staticmethod
-    def _human_key(key: str) -> Tuple[Union[str, float]]:
-        parts = re.split(r"(\d*\.\d+|\d+)", key)
-        return tuple(
-            (e.swapcase() if i % 2 == 0 else float(e)) for i, e in enumerate(parts)
-        )
+    # each key is tokenized once, not on every comparison
+    _human_key = staticmethod(_human_key)
 
     def hasChildren(self, index):
         return self.sourceModel().hasChildren(self.mapToSource(index))
 
-    def filterAcceptsRow(self, source_row, source_parent):
-        if not self.filterRegExp().pattern():
-            return True
-
-        source_index = self.sourceModel().index(source_row, 0, source_parent)
-        data = source_index.data(ItemRoles.KeyRole)
-
-        return self.filterRegExp().indexIn(data) != -1
-
     def lessThan(self, source_left, source_right):
         left_sort_data = source_left.data(ItemRoles.KeyRole)
         right_sort_data = source_right.data(ItemRoles.KeyRole)
@@ -133,39 +261,11 @@ class ProxyModel(QtCore.QSortFilterProxyModel):
 
 
 class Item(QtGui.QStandardItem):
-    class State(Enum):
-        Normal = 0
-        Expanded = 1
-        Selected = 2
-
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._icons = {}
-        self._state = self.State.Normal
 
         self.visible = False
 
-    @QtCore.Slot(QtGui.QIcon)  # type: ignore
-    def setIcon(self, icon: QtGui.QIcon, state: Optional[State] = None):
-        if state is None:
-            state = self.State.Normal
-
-        self._icons[state] = icon
-
-        # becomes true if state is None or Normal
-        if state == self._state:
-            super().setIcon(icon)
-
-    def set_state(self, state: State):
-        if state == self._state:
-            return
-
-        self._state = state
-
-        icon = self._icons.get(state)
-        if icon is not None:
-            super().setIcon(icon)
-
 
 class ItemDelegate(QtWidgets.QStyledItemDelegate):
     def __init__(
@@ -175,6 +275,10 @@ class ItemDelegate(QtWidgets.QStyledItemDelegate):
     ):
         super().__init__(parent)
         self._loader_render_callback = loader_render_callback
+        self._asset_decoration_size = QtCore.QSize(103, 58)
+        self._folder_icon = _themed_icon("fa5s.folder", FOLDER_COLOR, 0.8)
+        self._folder_open_icon = _themed_icon("fa5s.folder-open", FOLDER_COLOR, 0.8)
+        self._loader_bounds = QtCore.QRect(0, 0, 32, 32)
 
     def paint(
         self,
@@ -185,24 +289,33 @@ class ItemDelegate(QtWidgets.QStyledItemDelegate):
         opt = QtWidgets.QStyleOptionViewItem(option)
         self.initStyleOption(opt, index)
 
-        source_index = index.model().mapToSource(index)
-        item = source_index.model().itemFromIndex(source_index)
-
         is_decorated = opt.features & QtWidgets.QStyleOptionViewItem.HasDecoration
 
         opt.features |= QtWidgets.QStyleOptionViewItem.HasDecoration
 
-        if item.data(ItemRoles.EntityTypeRole) == EntityType.AssetName:
-            opt.decorationSize = QtCore.QSize(103, 58)
+        entity_type = unpack_item_state(index.data(ItemRoles.PackedRole))[0]
+
+        if entity_type == EntityType.AssetName:
+            opt.decorationSize = self._asset_decoration_size
+        elif index.data(ItemRoles.FolderRole):
+            # the view tracks the expanded state, so there's no need
+            # to swap the item icons on expanding and collapsing
+            if option.state & QtWidgets.QStyle.State_Open:
+                opt.icon = self._folder_open_icon
+            else:
+                opt.icon = self._folder_icon
 
         super().paint(painter, opt, index)
 
-        if item.data(ItemRoles.LoadingStateRole) == LoadingStates.InProgress:
+        # read after painting, since requesting the decoration might have
+        # started loading the icon
+        loading_state = unpack_item_state(index.data(ItemRoles.PackedRole))[2]
+        if loading_state == LoadingStates.InProgress:
             rect: QtCore.QRect = opt.rect
 
             decoration_rect = QtCore.QRect(rect.topLeft(), opt.decorationSize)
 
-            bounds = QtCore.QRect(0, 0, 32, 32)
+            bounds = QtCore.QRect(self._loader_bounds)
             if is_decorated:
                 bounds.moveCenter(rect.center())
                 bounds.moveRight(rect.right())
@@ -232,9 +345,21 @@ class AssetTreeView(QtWidgets.QTreeView):
         self._accessor = accessor
         self._loader_renderer = loader_renderer
 
-        self._mapping = {}
+        # items by their keys, the removed items are dropped right away
+        self._mapping: Dict[str, Item] = {}
+        # kept up to date on the selection changes, in the selection order
+        self._selected_asset_infos: Dict[Union[int, str], AssetInfo] = {}
+        # incremented on every reset to drop the results of the outdated
+        # requests, the regex ones included
+        self._regex_generation = 0
+        # set while the tree contains only the regex results
+        self._is_regex_mode = False
+        # assets by the project codes, the least recently used project first
+        self._project_cache: "OrderedDict[str, ProjectAssets]" = OrderedDict()
 
         self.setHeaderHidden(True)
+        # the 'entered' signal is emitted only with the mouse tracking on
+        self.setMouseTracking(True)
         self.setIconSize(QtCore.QSize(32, 32))
         self.setItemDelegate(ItemDelegate(self._loader_renderer.render))
         self.setSelectionMode(
@@ -242,11 +367,10 @@ class AssetTreeView(QtWidgets.QTreeView):
         )
 
         self._model = ItemModel(self, self._accessor)
+        self._model.set_visible_check(self._is_source_index_visible)
 
         self._proxy_model = ProxyModel()
         self._proxy_model.setSourceModel(self._model)
-        self._proxy_model.setRecursiveFilteringEnabled(True)
-        self._proxy_model.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
         self._proxy_model.setDynamicSortFilter(True)
 
         self.setModel(self._proxy_model)
@@ -256,77 +380,122 @@ class AssetTreeView(QtWidgets.QTreeView):
         self._init_signals()
         self._clear()
 
+    def _is_source_index_visible(self, source_index: QtCore.QModelIndex) -> bool:
+        index = self._proxy_model.mapFromSource(source_index)
+        return self.visualRect(index).intersects(self.viewport().rect())
+
     def _init_signals(self):
         self.expanded.connect(self._on_expanded)
-        self.collapsed.connect(self._on_collapsed)
+        self.entered.connect(self._on_hovered)
         self.clicked.connect(self._on_clicked)
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        self._model.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
 
         self.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
 
         self.customContextMenuRequested.connect(self._on_menu_requested)
+        self.selectionModel().selectionChanged.connect(self._on_selection_changed)
 
         self._loader_renderer.repaintNeeded.connect(self.viewport().repaint)
 
     def _init_icons(self):
-        folder_color = QtGui.QColor("#1abc9c")  # type: ignore
-        asset_type_color = QtGui.QColor("#f1c40f")  # type: ignore
+        asset_type_color = "#f1c40f"
         self._icons = {
-            "folder": qta.icon("fa5s.folder", color=folder_color, scale_factor=0.8),
-            "folder-open": qta.icon(
-                "fa5s.folder-open", color=folder_color, scale_factor=0.8
-            ),
-            "chr": qta.icon(
-                "fa5s.user-astronaut", color=asset_type_color, scale_factor=0.8
-            ),
-            "prp": qta.icon(
-                "fa5s.shopping-bag", color=asset_type_color, scale_factor=0.8
-            ),
-            "set": qta.icon(
-                "fa5s.layer-group", color=asset_type_color, scale_factor=0.8
-            ),
-            "loc": qta.icon("fa5s.mountain", color=asset_type_color, scale_factor=0.8),
-            "asset": qta.icon("fa5s.image", scale_factor=0.8),
+            "chr": _themed_icon("fa5s.user-astronaut", asset_type_color, 0.8),
+            "prp": _themed_icon("fa5s.shopping-bag", asset_type_color, 0.8),
+            "set": _themed_icon("fa5s.layer-group", asset_type_color, 0.8),
+            "loc": _themed_icon("fa5s.mountain", asset_type_color, 0.8),
+        }
+
+        # looked up for every created item
+        self._asset_type_icons = {
+            "Character": self._icons["chr"],
+            "Environment": self._icons["loc"],
+            "Prop": self._icons["prp"],
+            "Set": self._icons["set"],
         }
 
-    def _clear(self):
+    def _clear(self, load_root: bool = True):
+        self._regex_generation += 1
+        self._is_regex_mode = not load_root
+        # the selection model doesn't report the selection cleared on reset
+        self._selected_asset_infos.clear()
+        self._mapping.clear()
+        # the icons of the dropped items aren't needed anymore
+        self._model.cancel_icon_requests()
         self._model.clear()
         item = self._model.invisibleRootItem()
-        item.setData(LoadingStates.NotLoaded, ItemRoles.LoadingStateRole)
+        loading_state = LoadingStates.NotLoaded if load_root else LoadingStates.Loaded
+        item.setData(
+            pack_item_state(EntityType.AssetType, True, loading_state),
+            ItemRoles.PackedRole,
+        )
         self.state = self.State.Loading
         self._load_children(item)
 
     def load_by_regex(self, regex: Optional[str] = None):
         if regex:
-            self.state = self.State.Loading
+            # the database returns only the matching assets,
+            # so the tree is rebuilt from them
+            self._clear(load_root=False)
             self._load_children_by_regex(regex)
-        else:
-            self.state = self.State.Ready
-
-        if regex is None:
-            regex = ""
-
-        self._proxy_model.setFilterWildcard(regex)
+        elif self._is_regex_mode:
+            # bring back the whole tree
+            self._clear()
 
     def _on_expanded(self, parent_index: QtCore.QModelIndex):
         parent_index = self._proxy_model.mapToSource(parent_index)
         parent_item = self._model.itemFromIndex(parent_index)
-        parent_item.set_state(Item.State.Expanded)
         self._load_children(parent_item)
 
-    def _on_collapsed(self, parent_index: QtCore.QModelIndex):
-        parent_index = self._proxy_model.mapToSource(parent_index)
-        parent_item = self._model.itemFromIndex(parent_index)
-        parent_item.set_state(Item.State.Normal)
+        # the siblings are likely to be expanded next, so prefetch them
+        grandparent_item = parent_item.parent() or self._model.invisibleRootItem()
+        for row in range(grandparent_item.rowCount()):
+            sibling_item = grandparent_item.child(row)
+            if sibling_item is None:
+                continue
+
+            if unpack_item_state(sibling_item.data(ItemRoles.PackedRole))[1]:
+                self._load_children(sibling_item)
+
+    def _on_hovered(self, prx_index: QtCore.QModelIndex) -> None:
+        # start loading the children before the item gets clicked
+        if not unpack_item_state(prx_index.data(ItemRoles.PackedRole))[1]:
+            return
+
+        source_index = self._proxy_model.mapToSource(prx_index)
+        self._load_children(self._model.itemFromIndex(source_index))
 
     def _load_children(self, parent_item: Item):
-        if parent_item.data(ItemRoles.LoadingStateRole) != LoadingStates.NotLoaded:
+        entity_type, is_expandable, loading_state = unpack_item_state(
+            parent_item.data(ItemRoles.PackedRole)
+        )
+        if loading_state != LoadingStates.NotLoaded:
             return
 
-        parent_item.setData(LoadingStates.InProgress, ItemRoles.LoadingStateRole)
+        parent_item.setData(
+            pack_item_state(entity_type, is_expandable, LoadingStates.InProgress),
+            ItemRoles.PackedRole,
+        )
 
         if parent_item is self._model.invisibleRootItem():
+            generation = self._regex_generation
+            project_code = str(self._project.code)
+
+            # show the cached tree right away, the request below refreshes it
+            cached_assets = self._project_cache.get(project_code)
+            if cached_assets:
+                self._project_cache.move_to_end(project_code)
+                self._restore_cached_items(cached_assets)
+                self.state = self.State.Ready
 
             def _on_asset_types_loaded(asset_types: List[str]):
+                # the tree might have been reset meanwhile,
+                # e.g. for another project or the regex results
+                if generation != self._regex_generation:
+                    return
+
+                self._cache_asset_types(asset_types)
                 self._append_items(
                     self._model.invisibleRootItem(), EntityType.AssetType, asset_types
                 )
@@ -335,21 +504,140 @@ class AssetTreeView(QtWidgets.QTreeView):
             self._accessor.request_asset_types(_on_asset_types_loaded)
 
         else:
-            asset_query: Union[Dict[str, Union[str, Callable]], None] = None
+            self._load_children_page(parent_item)
 
-            entity_type = parent_item.data(ItemRoles.EntityTypeRole)
+    def _get_project_cache(self) -> ProjectAssets:
+        """Return the cached asset types and assets of the active project."""
+        project_code = str(self._project.code)
 
-            if entity_type == EntityType.AssetType:
-                asset_query = {"asset_type": parent_item.text()}
+        cached_assets = self._project_cache.get(project_code)
+        if cached_assets is not None:
+            self._project_cache.move_to_end(project_code)
+            return cached_assets
 
-            if asset_query:
-                asset_query["callback"] = partial(
-                    self._append_asset_items, parent_item, EntityType.AssetName
-                )
-                self._accessor.request_assets(**asset_query)
+        cached_assets = self._project_cache[project_code] = {}
+        if len(self._project_cache) > PROJECT_CACHE_SIZE:
+            self._project_cache.popitem(last=False)
+
+        return cached_assets
+
+    def _cache_asset_types(self, asset_types: List[str]) -> None:
+        cached_assets = self._get_project_cache()
+
+        for asset_type in set(cached_assets).difference(asset_types):
+            del cached_assets[asset_type]
+
+        for asset_type in asset_types:
+            cached_assets.setdefault(asset_type, None)
+
+    def _cache_assets(
+        self, asset_type: str, offset: int, assets: List[AssetInfo]
+    ) -> None:
+        cached_assets = self._get_project_cache()
+
+        # the first page replaces the previously loaded assets
+        type_assets = cached_assets.get(asset_type)
+        if offset == 0 or type_assets is None:
+            cached_assets[asset_type] = list(assets)
+        else:
+            type_assets.extend(assets)
+
+    def _restore_cached_items(self, cached_assets: ProjectAssets) -> None:
+        root_item = self._model.invisibleRootItem()
+        self._append_items(root_item, EntityType.AssetType, list(cached_assets))
+
+        parent_key = self._get_parent_key(root_item)
+        for asset_type, assets in cached_assets.items():
+            if assets is None:
+                continue
+
+            item = self._mapping.get(f"{parent_key}|{asset_type}")
+            if item is None:
+                continue
+
+            self._append_asset_items_page(item, 0, assets, is_cached=True)
+
+            # refresh all the cached pages at once in the background
+            limit = max(len(assets), ASSETS_PAGE_SIZE)
+            set_loading_state(item, LoadingStates.InProgress)
+            self._accessor.request_assets(
+                asset_type=asset_type,
+                callback=partial(
+                    self._apply_refreshed_assets,
+                    self._regex_generation,
+                    item,
+                    limit,
+                ),
+                limit=limit,
+                offset=0,
+            )
+
+    def _apply_refreshed_assets(
+        self, generation: int, parent_item: Item, limit: int, assets: List[AssetInfo]
+    ) -> None:
+        """Update the item restored from the cache with the received assets."""
+        if generation != self._regex_generation or not shiboken2.isValid(parent_item):
+            return
+
+        self._cache_assets(parent_item.text(), 0, assets)
+
+        # drop the assets which don't exist anymore
+        asset_names = {asset.name for asset in assets}
+        for row in reversed(range(parent_item.rowCount())):
+            if parent_item.child(row).text() not in asset_names:
+                parent_item.removeRow(row)
+
+        self._append_asset_items(parent_item, EntityType.AssetName, assets)
+
+        next_offset = None
+        if len(assets) >= limit:
+            next_offset = len(assets)
+
+        parent_item.setData(next_offset, ItemRoles.NextOffsetRole)
+
+    def _load_children_page(self, parent_item: Item, offset: int = 0) -> None:
+        asset_query: Union[Dict[str, Any], None] = None
+
+        entity_type = unpack_item_state(parent_item.data(ItemRoles.PackedRole))[0]
+
+        if entity_type == EntityType.AssetType:
+            asset_query = {"asset_type": parent_item.text()}
+
+        if asset_query:
+            asset_query["callback"] = partial(
+                self._append_asset_items_page, parent_item, offset
+            )
+            asset_query["limit"] = ASSETS_PAGE_SIZE
+            asset_query["offset"] = offset
+            self._accessor.request_assets(**asset_query)
+
+    def _on_scrolled(self, value: int) -> None:
+        if value < self.verticalScrollBar().maximum():
+            return
+
+        # request the next pages of the expanded asset types
+        root_item = self._model.invisibleRootItem()
+        for row in range(root_item.rowCount()):
+            item = root_item.child(row)
+
+            next_offset = item.data(ItemRoles.NextOffsetRole)
+            if next_offset is None:
+                continue
+
+            loading_state = unpack_item_state(item.data(ItemRoles.PackedRole))[2]
+            if loading_state != LoadingStates.Loaded:
+                continue
+
+            if not self.isExpanded(self._proxy_model.mapFromSource(item.index())):
+                continue
+
+            set_loading_state(item, LoadingStates.InProgress)
+            self._load_children_page(item, next_offset)
 
     def _load_children_by_regex(self, regex: str) -> None:
-        self._accessor.request_assets_by_regex(regex, self._append_asset_items_by_regex)
+        self._accessor.request_assets_by_regex(
+            regex, partial(self._append_asset_items_by_regex, self._regex_generation)
+        )
 
     def _on_clicked(self, prx_index: QtCore.QModelIndex):
         source_index = self._proxy_model.mapToSource(prx_index)
@@ -357,30 +645,39 @@ class AssetTreeView(QtWidgets.QTreeView):
 
         self.item_clicked.emit(item)
 
-        if prx_index.data(ItemRoles.ExpandableRole):
+        if unpack_item_state(prx_index.data(ItemRoles.PackedRole))[1]:
             if not self.isExpanded(prx_index):
                 self._load_children(item)
                 self.expand(prx_index)
             else:
                 self.collapse(prx_index)
 
+    def _on_selection_changed(
+        self, selected: QtCore.QItemSelection, deselected: QtCore.QItemSelection
+    ) -> None:
+        for index in deselected.indexes():
+            entity_type = unpack_item_state(index.data(ItemRoles.PackedRole))[0]
+            if entity_type == EntityType.AssetName:
+                asset_info = index.data(ItemRoles.DataRole)
+                self._selected_asset_infos.pop(asset_info.id, None)
+
+        for index in selected.indexes():
+            entity_type = unpack_item_state(index.data(ItemRoles.PackedRole))[0]
+            if entity_type == EntityType.AssetName:
+                asset_info = index.data(ItemRoles.DataRole)
+                self._selected_asset_infos[asset_info.id] = asset_info
+
     def _on_menu_requested(self, point: QtCore.QPoint) -> None:
         source_index = self._proxy_model.mapToSource(self.currentIndex())
         if not source_index.isValid():
             return
 
         item = self._model.itemFromIndex(source_index)
-        if item.data(ItemRoles.EntityTypeRole) == EntityType.AssetType:
+        entity_type = unpack_item_state(item.data(ItemRoles.PackedRole))[0]
+        if entity_type == EntityType.AssetType:
             return
 
-        asset_infos = []
-
-        for index in self.selectedIndexes():
-            if index.data(ItemRoles.EntityTypeRole) != EntityType.AssetName:
-                continue
-
-            asset_info = index.data(ItemRoles.DataRole)
-            asset_infos.append(asset_info)
+        asset_infos = list(self._selected_asset_infos.values())
 
         menu = QtWidgets.QMenu(self)
 
@@ -409,17 +706,38 @@ class AssetTreeView(QtWidgets.QTreeView):
         self._clear()
 
     def _find_item_by_key(self, key: str) -> Union[Item, None]:
-        child_item_ref = self._mapping.get(key)
+        return self._mapping.get(key)
 
-        # if an item with that key is not found
-        if child_item_ref is not None:
-            # dereference the child item
-            child_item = child_item_ref()
+    def _on_rows_about_to_be_removed(
+        self, parent_index: QtCore.QModelIndex, first: int, last: int
+    ) -> None:
+        parent_item = self._model.itemFromIndex(parent_index)
+        if parent_item is None:
+            parent_item = self._model.invisibleRootItem()
 
-            if child_item is not None and shiboken2.isValid(child_item):
-                return child_item
+        loading_asset_infos = []
 
-            del self._mapping[key]
+        items = [parent_item.child(row) for row in range(first, last + 1)]
+        while items:
+            item = items.pop()
+            if item is None:
+                continue
+
+            self._mapping.pop(item.data(ItemRoles.KeyRole), None)
+            items.extend(item.child(row) for row in range(item.rowCount()))
+
+            entity_type, _, loading_state = unpack_item_state(
+                item.data(ItemRoles.PackedRole)
+            )
+            if (
+                entity_type == EntityType.AssetName
+                and loading_state == LoadingStates.InProgress
+            ):
+                loading_asset_infos.append(item.data(ItemRoles.DataRole))
+
+        # don't load the icons of the removed items
+        if loading_asset_infos:
+            self._model.cancel_icon_requests(loading_asset_infos)
 
     def _append_items(
         self, parent_item: Item, entity_type: EntityType, labels: List[str]
@@ -427,10 +745,20 @@ class AssetTreeView(QtWidgets.QTreeView):
         if not shiboken2.isValid(parent_item):
             return
 
+        parent_key = self._get_parent_key(parent_item)
+
+        # all the items are inserted at once, so that the proxy model and
+        # the view are updated once and not per item
+        new_items = []
         for label in labels:
-            self._append_item(parent_item, label, entity_type)
+            key = sys.intern(f"{parent_key}|{label}")
+            if key not in self._mapping:
+                new_items.append(self._build_item(key, label, entity_type))
+
+        if new_items:
+            parent_item.appendRows(new_items)
 
-        parent_item.setData(LoadingStates.Loaded, ItemRoles.LoadingStateRole)
+        set_loading_state(parent_item, LoadingStates.Loaded)
 
     def _append_asset_items(
         self, parent_item: Item, entity_type: EntityType, assets: List[AssetInfo]
@@ -438,39 +766,103 @@ class AssetTreeView(QtWidgets.QTreeView):
         if not shiboken2.isValid(parent_item):
             return
 
+        self._insert_asset_items(parent_item, entity_type, assets)
+
+        set_loading_state(parent_item, LoadingStates.Loaded)
+
+    def _insert_asset_items(
+        self, parent_item: Item, entity_type: EntityType, assets: List[AssetInfo]
+    ) -> None:
+        parent_key = self._get_parent_key(parent_item)
+
+        new_items = []
         for asset in assets:
-            item = self._append_item(
-                parent_item, asset.name, entity_type, is_expandable=False
-            )
+            key = sys.intern(f"{parent_key}|{asset.name}")
+
+            item = self._mapping.get(key)
+            if item is None:
+                item = self._build_item(
+                    key, asset.name, entity_type, is_expandable=False
+                )
+                new_items.append(item)
+
             item.setData(asset, ItemRoles.DataRole)
 
-        parent_item.setData(LoadingStates.Loaded, ItemRoles.LoadingStateRole)
+        if new_items:
+            parent_item.appendRows(new_items)
 
-    def _append_asset_items_by_regex(self, assets: List[AssetInfo]) -> None:
-        for asset in assets:
-            asset_name = asset.name
-            asset_type = asset.type
+    def _append_asset_items_page(
+        self,
+        parent_item: Item,
+        offset: int,
+        assets: List[AssetInfo],
+        is_cached: bool = False,
+    ) -> None:
+        if not shiboken2.isValid(parent_item):
+            return
 
-            parent_item = self._model.invisibleRootItem()
-            parent_key = f"{self._project.code}|{asset_type}"
+        if not is_cached:
+            self._cache_assets(parent_item.text(), offset, assets)
 
-            asset_type_item = self._find_item_by_key(parent_key)
-            if asset_type_item is None:
-                asset_type_item = self._append_item(
-                    parent_item, asset_type, EntityType.AssetType
-                )
+        self._append_asset_items(parent_item, EntityType.AssetName, assets)
 
-            parent_item = asset_type_item
+        next_offset = None
+        if len(assets) >= ASSETS_PAGE_SIZE:
+            next_offset = offset + len(assets)
 
-            asset_name_item = self._find_item_by_key("{parent_key}|{asset_name}")
-            if asset_name_item is None:
-                child_item = self._append_item(
-                    parent_item, asset_name, EntityType.AssetName, is_expandable=False
-                )
-                child_item.setData(asset, ItemRoles.DataRole)
+        parent_item.setData(next_offset, ItemRoles.NextOffsetRole)
 
+    def _append_asset_items_by_regex(
+        self, generation: int, assets: List[AssetInfo]
+    ) -> None:
+        if generation != self._regex_generation:
+            return
+
+        # only the model updates are left for the main thread, the grouping
+        # is CPU bound, so it doesn't belong to the network thread pool
+        RequestRunnable.execute(
+            partial(_group_assets_by_type, assets),
+            partial(self._apply_regex_results, generation),
+            thread_pool=QtCore.QThreadPool.globalInstance(),
+        )
+
+    def _apply_regex_results(
+        self, generation: int, assets_by_type: Dict[str, List[AssetInfo]]
+    ) -> None:
+        chunks: Deque[Tuple[str, List[AssetInfo]]] = deque(
+            (asset_type, type_assets[i : i + ASSETS_CHUNK_SIZE])
+            for asset_type, type_assets in assets_by_type.items()
+            for i in range(0, len(type_assets), ASSETS_CHUNK_SIZE)
+        )
+        self._apply_regex_chunks(generation, chunks)
+
+    def _apply_regex_chunks(
+        self, generation: int, chunks: Deque[Tuple[str, List[AssetInfo]]]
+    ) -> None:
+        # the filter might have been changed or the view reloaded meanwhile
+        if generation != self._regex_generation:
+            return
+
+        if chunks:
+            asset_type, assets = chunks.popleft()
+
+            asset_type_item = self._append_item(
+                self._model.invisibleRootItem(), asset_type, EntityType.AssetType
+            )
+
+            # only the matching assets are shown, so the asset type
+            # mustn't load the rest of them when expanded
+            self._insert_asset_items(asset_type_item, EntityType.AssetName, assets)
+            set_loading_state(asset_type_item, LoadingStates.Loaded)
+
+        # show the first results right away, the rest are appended later
         self.state = self.State.Ready
 
+        if chunks:
+            QtCore.QTimer.singleShot(
+                0, partial(self._apply_regex_chunks, generation, chunks)
+            )
+
     def _append_item(
         self,
         parent_item: Item,
@@ -482,47 +874,72 @@ class AssetTreeView(QtWidgets.QTreeView):
         if not shiboken2.isValid(parent_item):
             parent_item = self._model.invisibleRootItem()
 
-        parent_key = parent_item.data(ItemRoles.KeyRole)
-        if not parent_key:
-            parent_key = str(self._project.code)
+        child_item, is_new = self._get_or_create_item(
+            parent_item, label, entity_type, key, is_expandable
+        )
+        if is_new:
+            parent_item.appendRow(child_item)
+
+        return child_item
+
+    def _get_or_create_item(
+        self,
+        parent_item: Item,
+        label: str,
+        entity_type: EntityType,
+        key: Optional[str] = None,
+        is_expandable: bool = True,
+    ) -> Tuple[Item, bool]:
+        """Return the existing child item or a new one, not yet inserted.
 
-        key = f"{parent_key}|{key or label}"
+        The second value tells whether the item is new.
+        """
+        key = sys.intern(f"{self._get_parent_key(parent_item)}|{key or label}")
 
         child_item = self._find_item_by_key(key)
         if child_item is not None:
-            return child_item
+            return child_item, False
+
+        return self._build_item(key, label, entity_type, is_expandable), True
 
+    def _get_parent_key(self, parent_item: Item) -> str:
+        parent_key = parent_item.data(ItemRoles.KeyRole)
+        if not parent_key:
+            parent_key = str(self._project.code)
+
+        return parent_key
+
+    def _build_item(
+        self,
+        key: str,
+        label: str,
+        entity_type: EntityType,
+        is_expandable: bool = True,
+    ) -> Item:
+        """Create and register a new item, the caller inserts it to the model."""
         child_item = Item(label)
 
-        child_item.setData(entity_type, ItemRoles.EntityTypeRole)
-        child_item.setData(is_expandable, ItemRoles.ExpandableRole)
+        child_item.setData(
+            pack_item_state(entity_type, is_expandable, LoadingStates.NotLoaded),
+            ItemRoles.PackedRole,
+        )
         child_item.setData(key, ItemRoles.KeyRole)
-        child_item.setData(LoadingStates.NotLoaded, ItemRoles.LoadingStateRole)
         child_item.setData(label, ItemRoles.DataRole)
 
         child_item.setEditable(False)
 
-        self._mapping[key] = weakref.ref(child_item)
-
-        parent_item.appendRow(child_item)
+        self._mapping[key] = child_item
 
         if entity_type == EntityType.AssetName:
             return child_item
 
         if entity_type == EntityType.AssetType:
-            if label == "Character":
-                child_item.setIcon(self._icons["chr"])
-            elif label == "Environment":
-                child_item.setIcon(self._icons["loc"])
-            elif label == "Prop":
-                child_item.setIcon(self._icons["prp"])
-            elif label == "Set":
-                child_item.setIcon(self._icons["set"])
+            icon = self._asset_type_icons.get(label)
+            if icon is not None:
+                child_item.setIcon(icon)
         else:
-            child_item.setIcon(self._icons["folder"], state=child_item.State.Normal)
-            child_item.setIcon(
-                self._icons["folder-open"], state=child_item.State.Expanded
-            )
+            # the folder icon is chosen by the delegate
+            child_item.setData(True, ItemRoles.FolderRole)
 
         return child_item
 
@@ -576,13 +993,19 @@ class AssetSelectorWidget(QtWidgets.QWidget):
         self._filter = QtWidgets.QLineEdit(self)
         self._filter.setMinimumHeight(32)
         self._filter.setPlaceholderText("Filter")
-        self._filter.setStyleSheet("padding-left: 8px")
+        self._filter.setObjectName("AssetFilter")
         self._filter.setFocus()  # type: ignore
 
+        # the filter is applied once the typing pauses, not on every keystroke
+        self._filter_timer = QtCore.QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(FILTER_DELAY)
+
     def _init_signals(self):
         self._tree_view.item_clicked.connect(self.item_clicked)
-        self._filter.textChanged.connect(self._on_filter_changed)
-        self._filter.returnPressed.connect(self._on_filter_return_pressed)
+        self._filter.textChanged.connect(self._filter_timer.start)
+        self._filter.returnPressed.connect(self._apply_filter_now)
+        self._filter_timer.timeout.connect(self._apply_filter_now)
 
     def _init_layout(self):
         layout = QtWidgets.QVBoxLayout(self)
@@ -590,13 +1013,41 @@ class AssetSelectorWidget(QtWidgets.QWidget):
         layout.addWidget(self._tree_view)
         layout.setContentsMargins(0, 0, 0, 0)  # type: ignore
 
-    def _on_filter_changed(self, new_text: str):
-        if not new_text:
-            self._tree_view.load_by_regex()
+    def _apply_filter_now(self):
+        self._filter_timer.stop()
+
+        regex = self._filter.text() or None
+        if regex:
+            # the regex is compiled by the workers, so make sure it's valid
+            # before the current results are dropped
+            try:
+                compile_regex(regex)
+            except regex_engine.error as e:
+                self._set_filter_error(str(e))
+                return
+
+        self._set_filter_error(None)
+        self._tree_view.load_by_regex(regex)
+
+    def _set_filter_error(self, error: Optional[str]) -> None:
+        self._filter.setToolTip(error or "")
+
+        is_invalid = error is not None
+        if self._filter.property("invalid") == is_invalid:
+            return
 
-    def _on_filter_return_pressed(self):
-        self._tree_view.load_by_regex(self._filter.text())
+        self._filter.setProperty("invalid", is_invalid)
+        # the stylesheet is reapplied only on polishing
+        self._filter.style().unpolish(self._filter)
+        self._filter.style().polish(self._filter)
 
     def set_active_project(self, project):
+        # the project reload drops the regex results anyway, so the cleared
+        # filter mustn't reload the tree once again after the delay
+        self._filter.blockSignals(True)
         self._filter.clear()
+        self._filter.blockSignals(False)
+        self._filter_timer.stop()
+        self._set_filter_error(None)
+
         self._tree_view.set_active_project(project)